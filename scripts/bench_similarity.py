@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.jsonl import exists, read_records
+from utils.normalizer import TitleNormalizer
+from utils import similarity
+from utils.similarity import TitleSimilarity
+from scripts.match_tmdb import PRUNE_BELOW
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+INPUT_FILE = os.path.join(ROOT_DIR, "data", "processed", "anilist_normalized.jsonl")
+
+MAX_TITLES = 2000
+CANDIDATES_PER_TITLE = 20
+
+# variantes próximas (troca/inserção/remoção de palavra e letra) por título:
+# é nesses pares, perto dos limiares, que uma métrica diferente muda decisões
+VARIANTS_PER_TITLE = 200
+
+WORDS = ["kara", "no", "attack", "punch", "idol", "zero", "season", "hero", "shin",
+         "kyojin", "tensei", "gate", "2", "ii", "final", "movie", "boku", "to"]
+
+# limiares de match_tmdb (SCORE_THRESHOLD / FAST_MATCH_THRESHOLD)
+THRESHOLDS = (0.75, 0.92)
+
+SAMPLE_TITLES = [
+    "Shingeki no Kyojin", "Attack on Titan", "Attack on Titan Season 2",
+    "Fullmetal Alchemist: Brotherhood", "Hagane no Renkinjutsushi",
+    "Cowboy Bebop", "Cowboy Bebop: Tengoku no Tobira", "Neon Genesis Evangelion",
+    "Shin Seiki Evangelion", "Steins;Gate", "Steins;Gate 0", "Made in Abyss",
+    "Kimetsu no Yaiba", "Demon Slayer: Kimetsu no Yaiba", "Mushoku Tensei",
+    "Sousou no Frieren", "Frieren: Beyond Journey's End", "One Piece",
+    "One Punch Man", "Boku no Hero Academia", "My Hero Academia",
+    "Jujutsu Kaisen", "Jujutsu Kaisen 0", "Spy x Family", "Chainsaw Man",
+    "Vinland Saga", "Monster", "Mob Psycho 100", "Haikyuu!!", "Hunter x Hunter",
+]
+
+# títulos reais AniList × resultado TMDB (mesma obra e obras vizinhas):
+# o limite superior usado na poda nunca pode ficar abaixo do score
+REAL_PAIRS = [
+    ("Shingeki no Kyojin", "Attack on Titan"),
+    ("Shingeki no Kyojin Season 2", "Attack on Titan"),
+    ("Shingeki no Kyojin: The Final Season", "Attack on Titan"),
+    ("Hagane no Renkinjutsushi: FULLMETAL ALCHEMIST", "Fullmetal Alchemist: Brotherhood"),
+    ("Fullmetal Alchemist", "Fullmetal Alchemist: Brotherhood"),
+    ("Kimetsu no Yaiba", "Demon Slayer: Kimetsu no Yaiba"),
+    ("Kimetsu no Yaiba: Mugen Ressha-hen", "Demon Slayer -Kimetsu no Yaiba- The Movie: Mugen Train"),
+    ("Sousou no Frieren", "Frieren: Beyond Journey's End"),
+    ("Boku no Hero Academia", "My Hero Academia"),
+    ("Boku no Hero Academia 2", "My Hero Academia"),
+    ("Shin Seiki Evangelion", "Neon Genesis Evangelion"),
+    ("Shin Seiki Evangelion Movie: THE END OF EVANGELION", "The End of Evangelion"),
+    ("Cowboy Bebop: Tengoku no Tobira", "Cowboy Bebop: The Movie"),
+    ("Steins;Gate 0", "Steins;Gate 0"),
+    ("Steins;Gate", "Steins;Gate: The Movie - Load Region of Déjà Vu"),
+    ("Mushoku Tensei: Isekai Ittara Honki Dasu", "Mushoku Tensei: Jobless Reincarnation"),
+    ("Mushoku Tensei II: Isekai Ittara Honki Dasu", "Mushoku Tensei: Jobless Reincarnation"),
+    ("Jujutsu Kaisen 0", "Jujutsu Kaisen 0"),
+    ("Gekijouban Jujutsu Kaisen 0", "Jujutsu Kaisen 0"),
+    ("SPY×FAMILY", "SPY x FAMILY"),
+    ("Chainsaw Man", "Chainsaw Man"),
+    ("Vinland Saga Season 2", "Vinland Saga"),
+    ("Mob Psycho 100 II", "Mob Psycho 100"),
+    ("Haikyuu!! Karasuno Koukou vs Shiratorizawa Gakuen Koukou", "Haikyu!!"),
+    ("HUNTER×HUNTER (2011)", "Hunter x Hunter"),
+    ("Hunter x Hunter", "Hunter × Hunter"),
+    ("One Punch Man", "One-Punch Man"),
+    ("ONE PIECE", "One Piece: Stampede"),
+    ("Made in Abyss: Retsujitsu no Ougonkyou", "Made in Abyss"),
+    ("Monster", "Monsters"),
+    ("進撃の巨人", "進撃の巨人"),
+    ("鋼の錬金術師 FULLMETAL ALCHEMIST", "鋼の錬金術師"),
+    ("葬送のフリーレン", "葬送のフリーレン"),
+    ("Kaguya-sama wa Kokurasetai: Tensai-tachi no Renai Zunousen", "Kaguya-sama: Love Is War"),
+    ("Re:Zero kara Hajimeru Isekai Seikatsu", "Re:ZERO -Starting Life in Another World-"),
+    ("Tensei shitara Slime Datta Ken", "That Time I Got Reincarnated as a Slime"),
+    ("Ore dake Level Up na Ken", "Solo Leveling"),
+    ("Yakusoku no Neverland", "The Promised Neverland"),
+    ("Kusuriya no Hitorigoto", "The Apothecary Diaries"),
+    ("Dandadan", "DAN DA DAN"),
+]
+
+# ==========================================================
+# LOG
+# ==========================================================
+
+def log(msg, level="INFO"):
+    print(f"[BENCH][{level}] {msg}", flush=True)
+
+# ==========================================================
+# REFERÊNCIA (IMPLEMENTAÇÃO ANTERIOR, SequenceMatcher)
+# ==========================================================
+
+def reference_score(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+
+    ratio_score = SequenceMatcher(None, a, b).ratio()
+
+    set_a, set_b = set(a.split()), set(b.split())
+    overlap_score = len(set_a & set_b) / len(set_a | set_b) if set_a and set_b else 0.0
+
+    contains_boost = 0.1 if a in b or b in a else 0.0
+
+    return min(round(ratio_score * 0.7 + overlap_score * 0.3 + contains_boost, 3), 1.0)
+
+# ==========================================================
+# DATA
+# ==========================================================
+
+def load_titles() -> list:
+    if exists(INPUT_FILE):
+        titles = [t for a in read_records(INPUT_FILE) for t in (a.get("_normalized") or {}).values()]
+    else:
+        log(f"{INPUT_FILE} ausente → usando amostra embutida", "WARN")
+        titles = [TitleNormalizer.normalize(t) for t in SAMPLE_TITLES]
+
+    titles = sorted({t for t in titles if t})
+    random.Random(42).shuffle(titles)
+    return titles[:MAX_TITLES]
+
+def mutate(title: str, rng: random.Random) -> str:
+    words = title.split()
+    op = rng.randrange(5)
+
+    if op == 0 and words:
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    elif op == 1:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(WORDS))
+    elif op == 2 and len(words) > 1:
+        words.pop(rng.randrange(len(words)))
+    else:
+        chars = list(title)
+        i = rng.randrange(len(chars))
+        if op == 3:
+            chars[i] = rng.choice("aeiouknrst")
+        else:
+            chars.insert(i, rng.choice("aeiouknrst"))
+        return "".join(chars)
+
+    return " ".join(words) or title
+
+def build_pairs(titles: list) -> list:
+    rng = random.Random(7)
+    pairs = []
+
+    for query in titles:
+        others = rng.sample(titles, min(CANDIDATES_PER_TITLE, len(titles)))
+        variants = [mutate(mutate(query, rng), rng) if rng.random() < 0.5 else mutate(query, rng)
+                    for _ in range(VARIANTS_PER_TITLE)]
+        pairs.append((query, others + variants))
+
+    return pairs
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def main():
+    titles = load_titles()
+    pairs = build_pairs(titles)
+    total = sum(len(c) for _, c in pairs)
+    log(f"{len(titles)} títulos, {total} pares")
+
+    started = time.perf_counter()
+    ref = [[reference_score(q, c) for c in cands] for q, cands in pairs]
+    t_ref = time.perf_counter() - started
+
+    started = time.perf_counter()
+    new = [[TitleSimilarity.score(q, c) for c in cands] for q, cands in pairs]
+    t_new = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = [TitleSimilarity.score_many(q, cands) for q, cands in pairs]
+    t_batch = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bounds = [[TitleSimilarity.score_upper_bound(q, c) for c in cands] for q, cands in pairs]
+    t_bound = time.perf_counter() - started
+
+    # caminho de find_best_match: limite LCS primeiro, difflib só acima de
+    # PRUNE_BELOW (caches frios, como numa execução nova)
+    similarity.prepare.cache_clear()
+    similarity._ratio.cache_clear()
+    started = time.perf_counter()
+    pruned = 0
+    for q, cands in pairs:
+        for c in cands:
+            if TitleSimilarity.score_upper_bound(q, c) < PRUNE_BELOW:
+                pruned += 1
+            else:
+                TitleSimilarity.score(q, c)
+    t_pruned = time.perf_counter() - started
+
+    flat_ref = [s for row in ref for s in row]
+    flat_new = [s for row in new for s in row]
+    diffs = [n - r for r, n in zip(flat_ref, flat_new)]
+
+    # score (primeira passada, cache frio) inclui o custo do difflib; o
+    # limite superior é o que o índice local usa para podar candidatos
+    log(f"referência: {t_ref:.3f}s | score: {t_new:.3f}s | score_many: {t_batch:.3f}s | limite LCS: {t_bound:.3f}s")
+    log(
+        f"find_best_match (poda < {PRUNE_BELOW}): {t_pruned:.3f}s, "
+        f"{pruned / total:.1%} dos pares sem difflib ({t_ref / t_pruned:.1f}x a referência)"
+    )
+    log(f"Diferença: max {max(diffs):+.3f} | min {min(diffs):+.3f} | média {sum(diffs) / len(diffs):+.4f}")
+    log(f"Scores idênticos: {sum(1 for d in diffs if d == 0) / len(diffs):.1%}")
+
+    # mesma métrica dos limiares: qualquer diferença é regressão
+    changed = sum(1 for d in diffs if d != 0)
+    failed = bool(changed)
+    if changed:
+        log(f"{changed} scores diferem da referência", "ERROR")
+
+    for threshold in THRESHOLDS:
+        flips = [(q, c, r, n) for (q, cands), rr, nr in zip(pairs, ref, new)
+                 for c, r, n in zip(cands, rr, nr) if (r >= threshold) != (n >= threshold)]
+        log(f"Decisões alteradas em {threshold}: {len(flips)}/{len(diffs)}", "ERROR" if flips else "INFO")
+        for q, c, r, n in flips[:5]:
+            log(f"  '{q}' × '{c}': {r:.3f} → {n:.3f}", "ERROR")
+        failed |= bool(flips)
+
+    loose = sum(1 for br, nr in zip(bounds, new) for b, n in zip(br, nr) if b < n)
+    if loose:
+        log(f"Limite superior abaixo do score em {loose} pares", "ERROR")
+        failed = True
+
+    real = [(TitleNormalizer.normalize(a), TitleNormalizer.normalize(b)) for a, b in REAL_PAIRS]
+    loose_real = [(a, b) for a, b in real if TitleSimilarity.score_upper_bound(a, b) < TitleSimilarity.score(a, b)]
+    for a, b in loose_real:
+        log(f"Limite superior abaixo do score (par real): '{a}' × '{b}'", "ERROR")
+    failed |= bool(loose_real)
+
+    if batch != new:
+        log("score_many diverge de score", "ERROR")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+    log(f"✔ scores idênticos à referência | score_many == score | limite LCS ≥ score ({len(real)} pares reais)")
+
+if __name__ == "__main__":
+    main()
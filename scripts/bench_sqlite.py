@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.normalizer import TitleNormalizer
+from utils.sqlite_export import AnimeDB, SQLiteExporter
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+INPUT_FILE = os.path.join(ROOT_DIR, "data", "final", "animes_enriched.json")
+
+# catálogo sintético quando não há export local
+SYNTHETIC_SIZE = 15000
+
+QUERIES = 300
+
+GENRES = ["Action", "Adventure", "Comedy", "Drama", "Fantasy", "Romance", "Sci-Fi", "Slice of Life"]
+WORDS = ["shingeki", "kyojin", "hero", "academia", "tensei", "slime", "yaiba", "kimetsu",
+         "bebop", "cowboy", "frieren", "sousou", "alchemist", "steins", "gate", "monster"]
+
+# ==========================================================
+# LOG
+# ==========================================================
+
+def log(msg, level="INFO"):
+    print(f"[BENCH][{level}] {msg}", flush=True)
+
+# ==========================================================
+# DATA
+# ==========================================================
+
+def synthetic_catalogue(size: int) -> list:
+    rng = random.Random(42)
+    animes = []
+
+    for i in range(1, size + 1):
+        title = " ".join(rng.sample(WORDS, 3)).title()
+        media_type = rng.choice(("tv", "movie"))
+        animes.append({
+            "anilist_id": i,
+            "titles": {"romaji": f"{title} {i}", "english": f"{title} {i}", "native": None},
+            "format": "TV" if media_type == "tv" else "MOVIE",
+            "status": "FINISHED",
+            "episodes": 12,
+            "year": rng.randint(1980, 2025),
+            "genres": rng.sample(GENRES, 2),
+            "anilist_score": rng.randint(40, 90),
+            "popularity": rng.randint(1, 500000),
+            "match": {"status": "MATCHED", "tmdb_id": 1000 + i // 2, "media_type": media_type},
+            "tmdb": {
+                "id": 1000 + i // 2,
+                "media_type": media_type,
+                "title": title,
+                "overview": "x" * 300,
+                "genres": ["Animation"],
+                "trailers": [{"name": "Trailer", "key": f"k{i}", "language": "ja", "official": True}],
+                "content_ratings": {"BR": "14", "US": "TV-14"},
+            },
+        })
+
+    return animes
+
+def stopword_only_anime(anilist_id: int) -> dict:
+    # todos os títulos normalizam para None (só stopwords)
+    return {
+        "anilist_id": anilist_id,
+        "titles": {"romaji": "Gekijouban", "english": "The Movie", "native": None},
+        "format": "MOVIE",
+        "status": "FINISHED",
+        "episodes": 1,
+        "year": 2000,
+        "genres": [],
+        "anilist_score": None,
+        "popularity": 0,
+        "match": {"status": "NOT_FOUND"},
+    }
+
+def load_catalogue() -> list:
+    if os.path.exists(INPUT_FILE):
+        with open(INPUT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    log(f"{INPUT_FILE} ausente → catálogo sintético de {SYNTHETIC_SIZE}", "WARN")
+    return synthetic_catalogue(SYNTHETIC_SIZE)
+
+# ==========================================================
+# SCAN (baseline)
+# ==========================================================
+
+def scan_anilist(animes, anilist_id):
+    return next((a for a in animes if a["anilist_id"] == anilist_id), None)
+
+def scan_tmdb(animes, key):
+    tmdb_id, media_type = key
+    return [a for a in animes if (a.get("tmdb") or {}).get("id") == tmdb_id
+            and a["tmdb"].get("media_type") == media_type]
+
+def scan_genre(animes, genre):
+    found = [a for a in animes if genre in (a.get("genres") or [])]
+    return sorted(found, key=lambda a: a.get("popularity") or 0, reverse=True)[:50]
+
+def scan_year(animes, year):
+    found = [a for a in animes if a.get("year") == year]
+    return sorted(found, key=lambda a: a.get("popularity") or 0, reverse=True)[:50]
+
+def scan_prefix(animes, prefix):
+    norm = TitleNormalizer.normalize(prefix)
+    found = [
+        a for a in animes
+        if any((TitleNormalizer.normalize(t) or "").startswith(norm) for t in (a.get("titles") or {}).values() if t)
+    ]
+    return sorted(found, key=lambda a: a.get("popularity") or 0, reverse=True)[:20]
+
+# ==========================================================
+# BENCH
+# ==========================================================
+
+def timed(fn, args) -> float:
+    started = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - started) / len(args) * 1e6
+
+def main():
+    animes = load_catalogue()
+    rng = random.Random(7)
+
+    edge = stopword_only_anime(max(a["anilist_id"] for a in animes) + 1)
+    animes.append(edge)
+
+    tmpdir = tempfile.mkdtemp()
+    json_path = os.path.join(tmpdir, "animes.json")
+    db_path = os.path.join(tmpdir, "animes.sqlite")
+
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(animes, f, ensure_ascii=False)
+
+    started = time.perf_counter()
+    with SQLiteExporter(db_path) as exporter:
+        for anime in animes:
+            exporter.write(anime)
+    t_build = time.perf_counter() - started
+
+    with AnimeDB(db_path) as db:
+        if db.by_anilist_id(edge["anilist_id"]) != edge or not db.search("gekijouban"):
+            log("Anime com títulos só de stopwords não foi exportado corretamente", "ERROR")
+            sys.exit(1)
+
+    log(
+        f"{len(animes)} animes | build SQLite {t_build:.2f}s | "
+        f"JSON {os.path.getsize(json_path) / 1e6:.1f} MB | SQLite {os.path.getsize(db_path) / 1e6:.1f} MB"
+    )
+
+    # ======================================================
+    # COLD: abrir + 1 consulta
+    # ======================================================
+
+    target = rng.choice(animes)["anilist_id"]
+
+    started = time.perf_counter()
+    with open(json_path, "r", encoding="utf-8") as f:
+        loaded = json.load(f)
+    scan_anilist(loaded, target)
+    t_cold_json = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with AnimeDB(db_path) as db:
+        db.by_anilist_id(target)
+    t_cold_db = time.perf_counter() - started
+
+    log(f"Frio (abrir + 1 lookup): JSON {t_cold_json * 1000:.1f}ms | SQLite {t_cold_db * 1000:.2f}ms")
+
+    # ======================================================
+    # WARM: latência média por consulta
+    # ======================================================
+
+    sample = rng.sample(animes, min(QUERIES, len(animes)))
+    ids = [a["anilist_id"] for a in sample]
+    tmdb_keys = [(a["tmdb"]["id"], a["tmdb"]["media_type"]) for a in sample if a.get("tmdb")]
+    genres = [g for a in sample for g in a.get("genres") or []][:50] or ["Action"]
+    years = [a["year"] for a in sample if a.get("year")][:50] or [2000]
+    prefixes = [(a["titles"].get("romaji") or "")[:5] for a in sample][:50]
+    texts = [" ".join((a["titles"].get("romaji") or "").split()[:2]) for a in sample][:50]
+
+    with AnimeDB(db_path) as db:
+        cases = [
+            ("anilist_id", ids, lambda x: scan_anilist(loaded, x), db.by_anilist_id),
+            ("tmdb_id", tmdb_keys, lambda x: scan_tmdb(loaded, x), lambda x: db.by_tmdb_id(*x)),
+            ("gênero", genres, lambda x: scan_genre(loaded, x), db.by_genre),
+            ("ano", years, lambda x: scan_year(loaded, x), db.by_year),
+            ("prefixo", prefixes, lambda x: scan_prefix(loaded, x), db.title_prefix),
+            ("FTS", texts, None, db.search),
+        ]
+
+        for name, args, scan, query in cases:
+            t_db = timed(query, args)
+            if scan is None:
+                log(f"{name:<10} SQLite {t_db:9.1f}µs")
+                continue
+
+            t_scan = timed(scan, args)
+            log(f"{name:<10} SQLite {t_db:9.1f}µs | scan JSON {t_scan:11.1f}µs | {t_scan / t_db:7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import glob
+import os
+import sys
+from datetime import date, timedelta
+
+import requests
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.http_cache import get_default_cache
+from utils.tmdb_index import INDEX_FILE, TMDBTitleIndex
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+EXPORT_DIR = os.path.join(ROOT_DIR, "data", "cache", "tmdb_exports")
+EXPORT_URL = "http://files.tmdb.org/p/exports/{name}_ids_{day:%m_%d_%Y}.json.gz"
+
+# baixa o export diário de ontem se não houver nenhum local
+DOWNLOAD_EXPORTS = True
+
+# export de filmes tem ~1M linhas: corta a cauda sem popularidade
+EXPORTS = {
+    "tv": ("tv_series", 0.5),
+    "movie": ("movie", 1.0),
+}
+
+# ==========================================================
+# LOG
+# ==========================================================
+
+def log(msg, level="INFO"):
+    print(f"[INDEX][{level}] {msg}", flush=True)
+
+# ==========================================================
+# EXPORTS
+# ==========================================================
+
+def download_export(name: str) -> str:
+    day = date.today() - timedelta(days=1)
+    url = EXPORT_URL.format(name=name, day=day)
+    path = os.path.join(EXPORT_DIR, os.path.basename(url))
+
+    log(f"Baixando {url}")
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+
+    with requests.get(url, stream=True, timeout=60) as r:
+        r.raise_for_status()
+        with open(path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+
+    return path
+
+def find_export(name: str) -> str:
+    files = sorted(glob.glob(os.path.join(EXPORT_DIR, f"{name}_ids_*.json.gz")))
+    if files:
+        return files[-1]
+
+    if DOWNLOAD_EXPORTS:
+        return download_export(name)
+
+    return ""
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def main():
+    index = TMDBTitleIndex()
+
+    for media_type, (name, min_popularity) in EXPORTS.items():
+        try:
+            path = find_export(name)
+        except requests.RequestException as e:
+            log(f"Export {name} indisponível: {e}", "WARN")
+            continue
+
+        if path:
+            index.add_export_file(path, media_type, min_popularity)
+
+    # buscas e detalhes já em cache trazem gênero, ano e títulos alternativos
+    cache = get_default_cache()
+    if cache:
+        index.add_from_cache(cache)
+
+    if not len(index):
+        log("Nenhum título para indexar", "WARN")
+        return
+
+    index.save(INDEX_FILE)
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,53 @@
 
 import json
 import os
+import sys
 import time
-from typing import Dict
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from datetime import date
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.checkpoint import Journal
+from utils.jsonl import exists, read_at, read_records, read_with_offsets, write_records
+from utils.async_tmdb_client import AsyncTMDBClient
 from utils.tmdb_client import TMDBClient
 
 # ==========================================================
 # CONFIG
 # ==========================================================
 
-INPUT_FILE = "data/processed/animes_matched.json"
-OUTPUT_FILE = "data/processed/animes_enriched.json"
+INPUT_FILE = "data/processed/animes_matched.jsonl"
+OUTPUT_FILE = "data/processed/animes_enriched.jsonl"
+STATE_FILE = "data/processed/enrich_state.json"
 
 DELAY_BETWEEN_REQUESTS = 0.2  # seguro com cache
 
+# retoma do journal de checkpoint se a execução anterior caiu
+RESUME = True
+
+TMDB_FIELDS = ("tmdb", "tmdb_localized", "tmdb_fallback")
+
+# só re-enriquece IDs presentes em /tv/changes e /movie/changes
+USE_CHANGES_FEED = True
+
+# último run mais antigo que isso → re-enriquecimento completo
+CHANGES_MAX_DAYS = 90
+
+# blocos TMDB mantidos em memória (o resto vem do cache HTTP)
+TMDB_CACHE_SIZE = 2048
+
+# enriquecimento concorrente (AsyncTMDBClient, vários tokens); a saída
+# continua na ordem de entrada
+USE_ASYNC_CLIENT = False
+ASYNC_CONCURRENCY = 8
+
+# registros adiantados além do que já foi escrito
+ASYNC_WINDOW = ASYNC_CONCURRENCY * 4
+
 # ==========================================================
 # LOG
 # ==========================================================
@@ -27,16 +60,22 @@ def log(msg, level="INFO"):
 # CACHE (TMDB ID)
 # ==========================================================
 
-_tmdb_cache: Dict[str, dict] = {}
+_tmdb_cache: "OrderedDict[str, dict]" = OrderedDict()
 
 def cache_key(tmdb_id: int, media_type: str) -> str:
     return f"{media_type}:{tmdb_id}"
 
 def get_cached(tmdb_id: int, media_type: str):
-    return _tmdb_cache.get(cache_key(tmdb_id, media_type))
+    key = cache_key(tmdb_id, media_type)
+    data = _tmdb_cache.get(key)
+    if data is not None:
+        _tmdb_cache.move_to_end(key)
+    return data
 
 def set_cached(tmdb_id: int, media_type: str, data: dict):
     _tmdb_cache[cache_key(tmdb_id, media_type)] = data
+    while len(_tmdb_cache) > TMDB_CACHE_SIZE:
+        _tmdb_cache.popitem(last=False)
 
 # ==========================================================
 # HELPERS
@@ -50,19 +89,103 @@ def get_display_title(anime: dict) -> str:
         or f"AniList ID {anime.get('id', '?')}"
     )
 
+# ==========================================================
+# CHANGES FEED
+# ==========================================================
+
+def load_state() -> dict:
+    if not os.path.exists(STATE_FILE):
+        return {}
+
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state: dict):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+def load_previous_enrichment() -> Dict[int, dict]:
+    """
+    Chave TMDB e offset no arquivo do run anterior, por anilist_id.
+    Os blocos são relidos sob demanda (previous_blocks).
+    """
+    if not exists(OUTPUT_FILE):
+        return {}
+
+    previous = {}
+    for offset, anime in read_with_offsets(OUTPUT_FILE):
+        match = anime.get("match") or {}
+        if not anime.get("tmdb"):
+            continue
+
+        entry = {"key": cache_key(match.get("tmdb_id"), match.get("media_type")), "offset": offset}
+        if offset is None:
+            # arquivo antigo (array JSON): sem offset, guarda os blocos
+            entry.update({field: anime.get(field) for field in TMDB_FIELDS})
+
+        previous[anime["anilist_id"]] = entry
+
+    return previous
+
+def previous_blocks(prev: dict) -> dict:
+    source = prev if prev["offset"] is None else read_at(OUTPUT_FILE, prev["offset"])
+    return {field: source.get(field) for field in TMDB_FIELDS}
+
+def fetch_changed_keys(client: TMDBClient, since: date) -> Optional[Set[str]]:
+    changed: Set[str] = set()
+
+    for media_type in ("tv", "movie"):
+        ids = client.changes(media_type, since)
+        if ids is None:
+            log(f"Feed /{media_type}/changes indisponível → re-enriquecendo tudo", "WARN")
+            return None
+        changed.update(cache_key(i, media_type) for i in ids)
+
+    return changed
+
+def plan_reuse(client: TMDBClient, state: dict) -> tuple:
+    """
+    (blocos anteriores, chaves alteradas) — ou ({}, None) se não der para reaproveitar.
+    """
+    if not USE_CHANGES_FEED or not state.get("last_run"):
+        return {}, None
+
+    since = date.fromisoformat(state["last_run"])
+    if (date.today() - since).days > CHANGES_MAX_DAYS:
+        log(f"Último run em {since} (> {CHANGES_MAX_DAYS} dias) → re-enriquecendo tudo")
+        return {}, None
+
+    previous = load_previous_enrichment()
+    if not previous:
+        return {}, None
+
+    changed = fetch_changed_keys(client, since)
+    if changed is None:
+        return {}, None
+
+    log(f"Changes desde {since}: {len(changed)} IDs TMDB alterados")
+    return previous, changed
+
 # ==========================================================
 # ENRICHMENT
 # ==========================================================
 
-def enrich_anime(anime: dict, client: TMDBClient) -> dict:
+def clear_enrichment(anime: dict):
+    anime["tmdb"] = None
+    anime["tmdb_localized"] = None
+    anime["tmdb_fallback"] = None
+
+def enrich_target(anime: dict) -> Optional[Tuple[int, str]]:
+    """
+    (tmdb_id, media_type) a enriquecer, ou None (registro já limpo).
+    """
     match = anime.get("match") or {}
 
     status = match.get("status")
     if status != "MATCHED":
-        anime["tmdb"] = None
-        anime["tmdb_localized"] = None
-        anime["tmdb_fallback"] = None
-        return anime
+        clear_enrichment(anime)
+        return None
 
     tmdb_id = match.get("tmdb_id")
     media_type = match.get("media_type")
@@ -70,8 +193,29 @@ def enrich_anime(anime: dict, client: TMDBClient) -> dict:
     if not tmdb_id or media_type not in ("tv", "movie"):
         log(f"Match inválido (id={tmdb_id}, type={media_type})", "WARN")
         anime["tmdb"] = None
+        return None
+
+    return tmdb_id, media_type
+
+def apply_enrichment(anime: dict, tmdb_id: int, media_type: str, data: Optional[dict]) -> dict:
+    if not data or not data.get("tmdb"):
+        log(f"Falha ao enriquecer TMDB ID={tmdb_id}", "WARN")
+        anime["tmdb"] = None
         return anime
 
+    blocks = {field: data.get(field) for field in TMDB_FIELDS}
+    anime.update(blocks)
+    set_cached(tmdb_id, media_type, blocks)
+
+    return anime
+
+def enrich_anime(anime: dict, client: TMDBClient, refresh: bool = False) -> dict:
+    target = enrich_target(anime)
+    if target is None:
+        return anime
+
+    tmdb_id, media_type = target
+
     # ======================================================
     # CACHE
     # ======================================================
@@ -86,70 +230,163 @@ def enrich_anime(anime: dict, client: TMDBClient) -> dict:
     # ======================================================
 
     try:
-        data = client.enrich(tmdb_id, media_type)
-
-        if not data or not data.get("tmdb"):
-            log(f"Falha ao enriquecer TMDB ID={tmdb_id}", "WARN")
-            anime["tmdb"] = None
-            return anime
-
-        anime["tmdb"] = data.get("tmdb")
-        anime["tmdb_localized"] = data.get("tmdb_localized")
-        anime["tmdb_fallback"] = data.get("tmdb_fallback")
-
-        set_cached(
-            tmdb_id,
-            media_type,
-            {
-                "tmdb": anime["tmdb"],
-                "tmdb_localized": anime["tmdb_localized"],
-                "tmdb_fallback": anime["tmdb_fallback"],
-            },
-        )
+        data = client.enrich(tmdb_id, media_type, refresh=refresh)
+    except Exception as e:
+        log(f"Erro TMDB ID={tmdb_id}: {e}", "ERROR")
+        clear_enrichment(anime)
+        return anime
+
+    return apply_enrichment(anime, tmdb_id, media_type, data)
 
+def finish_async(anime: dict, target: Tuple[int, str], future: Future) -> dict:
+    tmdb_id, media_type = target
+
+    cached = get_cached(tmdb_id, media_type)
+    if cached:
+        # outro registro com o mesmo ID já concluiu
+        anime.update(cached)
         return anime
 
+    try:
+        data = future.result()
     except Exception as e:
         log(f"Erro TMDB ID={tmdb_id}: {e}", "ERROR")
-        anime["tmdb"] = None
-        anime["tmdb_localized"] = None
-        anime["tmdb_fallback"] = None
+        clear_enrichment(anime)
         return anime
 
+    return apply_enrichment(anime, tmdb_id, media_type, data)
+
 # ==========================================================
-# MAIN
+# STREAM
 # ==========================================================
 
-def main():
-    if not os.path.exists(INPUT_FILE):
-        raise FileNotFoundError(INPUT_FILE)
+def process(animes: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Enriquece registro a registro. O journal é removido e o estado salvo
+    quando o stream termina.
 
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        animes = json.load(f)
+    Com USE_ASYNC_CLIENT, até ASYNC_WINDOW registros ficam em voo no
+    AsyncTMDBClient; a saída e o journal seguem a ordem de entrada.
+    """
+    total = 0
+    enriched = 0
 
-    client = TMDBClient()
+    journal = Journal("enrich", meta={"fields": list(TMDB_FIELDS)})
+    done = journal.load() if RESUME else {}
+    if done:
+        log(f"Retomando checkpoint: {len(done)} já processados")
 
-    total = len(animes)
-    enriched = 0
+    state = load_state()
+    reused = 0
+
+    # registros à espera da resposta, na ordem de entrada:
+    # (anime, alvo TMDB, future ou None, chave do journal ou None)
+    pending: deque = deque()
+    inflight: Dict[str, Future] = {}
+    window = ASYNC_WINDOW if USE_ASYNC_CLIENT else 0
 
-    for i, anime in enumerate(animes, 1):
-        title = get_display_title(anime)
-        log(f"[{i}/{total}] {title}")
+    def drain(limit: int) -> Iterator[Dict]:
+        nonlocal enriched
 
-        enrich_anime(anime, client)
+        while len(pending) > limit:
+            anime, target, future, key = pending.popleft()
 
-        if anime.get("tmdb"):
-            enriched += 1
+            if future is not None:
+                finish_async(anime, target, future)
+                if inflight.get(key) is future:
+                    del inflight[key]
 
-        time.sleep(DELAY_BETWEEN_REQUESTS)
+            if key is not None:
+                journal.append(anime["anilist_id"], {
+                    "key": key,
+                    "blocks": {field: anime.get(field) for field in TMDB_FIELDS},
+                })
+
+            if anime.get("tmdb"):
+                enriched += 1
+
+            yield anime
+
+    async_client = AsyncTMDBClient(concurrency=ASYNC_CONCURRENCY) if USE_ASYNC_CLIENT else None
+
+    try:
+        with TMDBClient() as client, journal.open(resume=RESUME):
+            previous, changed = plan_reuse(client, state)
+
+            for i, anime in enumerate(animes, 1):
+                total = i
+                match = anime.get("match") or {}
+                key = cache_key(match.get("tmdb_id"), match.get("media_type"))
+                prev = previous.get(anime["anilist_id"])
+
+                # entrada do journal só vale para o mesmo match (tmdb_id/media_type)
+                resumed = done.get(anime["anilist_id"])
+                if resumed and resumed.get("key") == key:
+                    anime.update(resumed["blocks"])
+                    pending.append((anime, None, None, None))
+                elif match.get("status") == "MATCHED" and prev and prev["key"] == key and key not in changed:
+                    anime.update(previous_blocks(prev))
+                    reused += 1
+                    pending.append((anime, None, None, None))
+                else:
+                    title = get_display_title(anime)
+                    log(f"[{i}] {title}")
+
+                    # alterado no TMDB: não aceita resposta ainda fresca no cache HTTP
+                    refresh = bool(changed and key in changed)
+
+                    if async_client is None:
+                        enrich_anime(anime, client, refresh=refresh)
+                        pending.append((anime, None, None, key))
+                        time.sleep(DELAY_BETWEEN_REQUESTS)
+                    else:
+                        target = enrich_target(anime)
+                        future = None
+
+                        if target is not None:
+                            cached = get_cached(*target)
+                            if cached:
+                                anime.update(cached)
+                            else:
+                                # mesmo ID TMDB já em voo: compartilha a requisição
+                                future = inflight.get(key)
+                                if future is None:
+                                    future = inflight[key] = async_client.submit(
+                                        async_client.enrich(*target, refresh=refresh)
+                                    )
+
+                        pending.append((anime, target, future, key))
+
+                yield from drain(window)
+
+            yield from drain(0)
+
+            client.log_stats()
+            if async_client is not None:
+                async_client.log_stats()
+    finally:
+        if async_client is not None:
+            async_client.close()
 
     log(f"✔ Enriquecidos: {enriched}/{total}")
+    if previous:
+        log(f"✔ Reaproveitados (sem mudança no TMDB): {reused}")
     log(f"✔ Cache TMDB usado: {len(_tmdb_cache)} itens")
+    if client.cache:
+        client.cache.log_stats()
+
+    save_state({"last_run": date.today().isoformat()})
+    journal.remove()
+
+# ==========================================================
+# MAIN
+# ==========================================================
 
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(animes, f, ensure_ascii=False, indent=2)
+def main():
+    if not exists(INPUT_FILE):
+        raise FileNotFoundError(INPUT_FILE)
 
+    write_records(OUTPUT_FILE, process(read_records(INPUT_FILE)))
     log(f"Arquivo salvo em {OUTPUT_FILE}")
 
 # ==========================================================
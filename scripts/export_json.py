@@ -2,13 +2,25 @@
 
 import json
 import os
-from jsonschema import validate, ValidationError
+import sys
+import time
+from contextlib import nullcontext
+from typing import Dict, Iterable
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.compression import available, compress_file
+from utils.dataset import ShardedDatasetWriter
+from utils.jsonl import JsonArrayWriter, exists, read_records
+from utils.sqlite_export import SQLiteExporter
+from utils.validation import get_validator
 
 # ==========================================================
 # CONFIG
 # ==========================================================
 
-INPUT_FILE = "data/processed/animes_enriched.json"
+INPUT_FILE = "data/processed/animes_enriched.jsonl"
 SCHEMA_FILE = "schemas/anime.schema.json"
 
 OUT_ENRICHED = "data/final/animes_enriched.json"
@@ -18,6 +30,31 @@ OUT_NOT_MATCHED = "data/final/animes_not_matched.json"
 INDEX_ANILIST = "data/indexes/by_anilist_id.json"
 INDEX_TMDB = "data/indexes/by_tmdb_id.json"
 
+# shards JSONL por faixa de anilist_id + índice de offsets (utils/dataset.py),
+# para ler um anime sem baixar/parsear animes_enriched.json inteiro;
+# desligado por padrão: duplica o catálogo no commit semanal
+SHARDED_EXPORT = False
+SHARDS_DIR = "data/final/shards"
+
+# banco SQLite com tabelas normalizadas + FTS5 (utils/sqlite_export.py);
+# desligado por padrão: binário grande demais para versionar a cada run
+SQLITE_EXPORT = False
+SQLITE_FILE = "data/final/animes.sqlite"
+
+# JSON minificado em vez de indent=2; desligado por padrão: muda o formato
+# publicado e o diff de cada commit semanal
+COMPACT = False
+
+# irmãos pré-comprimidos + manifest com os tamanhos; desligado por padrão:
+# binários novos a cada run não devem ir para o histórico do git
+COMPRESSED_ARTIFACTS = False
+
+# tamanhos (bytes) de cada variante, para o consumidor escolher a menor
+MANIFEST_FILE = "data/final/manifest.json"
+
+# irmãos pré-comprimidos (.br/.zst só se brotli/zstandard estiverem instalados)
+COMPRESS_FORMATS = ("gz", "br", "zst")
+
 # ==========================================================
 # LOG
 # ==========================================================
@@ -36,94 +73,155 @@ def load_json(path):
 def save_json(path, data):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        if COMPACT:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=2)
 
 def clean_temporary_fields(anime: dict) -> dict:
     anime.pop("_normalized", None)
     return anime
 
-def validate_anime(anime: dict, schema: dict):
-    validate(instance=anime, schema=schema)
+def validate_anime(anime: dict) -> list:
+    return get_validator(SCHEMA_FILE).errors(anime)
 
 # ==========================================================
-# MAIN
+# ARTIFACTS
 # ==========================================================
 
-def main():
-    log("Carregando dados...")
-    animes = load_json(INPUT_FILE)
-    schema = load_json(SCHEMA_FILE)
+def write_artifacts(paths: list):
+    """
+    Comprime os arquivos finais já gravados e escreve o manifest.
+    """
+    formats = available(COMPRESS_FORMATS)
+    missing = sorted(set(COMPRESS_FORMATS) - set(formats))
+    if missing:
+        log(f"Compressão indisponível: {', '.join(missing)} (pip install brotli zstandard)", "WARN")
+
+    manifest = {}
+    started = time.perf_counter()
+
+    for path in paths:
+        report = compress_file(path, formats)
+
+        sizes = " | ".join(
+            f"{fmt} {info['bytes'] / 1024:.1f} KB"
+            + (f" ({info['seconds']:.2f}s)" if fmt != "identity" else "")
+            for fmt, info in report.items()
+        )
+        log(f"{os.path.basename(path)}: {sizes}")
+
+        sizes = {fmt: info["bytes"] for fmt, info in report.items()}
+        manifest[os.path.relpath(path, os.path.dirname(MANIFEST_FILE))] = {
+            **sizes,
+            "smallest": min(sizes, key=sizes.get),
+        }
+
+    save_json(MANIFEST_FILE, {"compact": COMPACT, "files": manifest})
+    log(f"Artefatos comprimidos em {time.perf_counter() - started:.1f}s")
 
-    enriched = []
-    no_tmdb = []
-    not_matched = []
+# ==========================================================
+# EXPORT
+# ==========================================================
 
-    log(f"Processando {len(animes)} animes...")
+def export(animes: Iterable[Dict]):
+    """
+    Distribui o stream nos arquivos finais (arrays JSON, formato consumido
+    pelos clientes) e gera os indexes pela posição em animes_enriched.
+    """
+    index_anilist = {}
+    index_tmdb = {}
+    invalid = 0
 
-    for anime in animes:
-        anime = clean_temporary_fields(anime)
+    log("Processando animes...")
 
-        match = anime.get("match", {})
-        status = match.get("status")
+    indent = None if COMPACT else 2
 
-        # ❌ Nunca valida NOT_MATCHED contra schema final
-        if status != "MATCHED":
-            not_matched.append(anime)
-            continue
+    with JsonArrayWriter(OUT_ENRICHED, indent) as enriched, \
+            JsonArrayWriter(OUT_NO_TMDB, indent) as no_tmdb, \
+            JsonArrayWriter(OUT_NOT_MATCHED, indent) as not_matched, \
+            (ShardedDatasetWriter(SHARDS_DIR) if SHARDED_EXPORT else nullcontext()) as shards, \
+            (SQLiteExporter(SQLITE_FILE) if SQLITE_EXPORT else nullcontext()) as sqlite:
 
-        # MATCHED mas sem TMDB
-        if not anime.get("tmdb"):
-            no_tmdb.append(anime)
-            continue
+        for anime in animes:
+            anime = clean_temporary_fields(anime)
 
-        # ✅ Agora sim valida schema
-        try:
-            validate_anime(anime, schema)
-        except ValidationError as e:
-            log(
-                f"Schema inválido (AniList ID {anime.get('anilist_id')}): {e.message}",
-                "ERROR",
-            )
-            raise
+            match = anime.get("match", {})
+            status = match.get("status")
 
-        enriched.append(anime)
+            # ❌ Nunca valida NOT_MATCHED contra schema final
+            if status != "MATCHED":
+                not_matched.write(anime)
+                continue
 
-    # ======================================================
-    # SAVE FILES
-    # ======================================================
+            # MATCHED mas sem TMDB
+            if not anime.get("tmdb"):
+                no_tmdb.write(anime)
+                continue
 
-    log("Salvando arquivos finais...")
-    save_json(OUT_ENRICHED, enriched)
-    save_json(OUT_NO_TMDB, no_tmdb)
-    save_json(OUT_NOT_MATCHED, not_matched)
+            # ✅ Agora sim valida schema (todos os erros, de todos os animes)
+            errors = validate_anime(anime)
+            if errors:
+                log(
+                    f"Schema inválido (AniList ID {anime.get('anilist_id')}): {'; '.join(errors)}",
+                    "ERROR",
+                )
+                invalid += 1
+                continue
 
-    # ======================================================
-    # INDEXES (APENAS ENRICHED)
-    # ======================================================
+            # ==================================================
+            # INDEXES (APENAS ENRICHED)
+            # ==================================================
 
-    log("Gerando indexes...")
+            i = enriched.count
+            index_anilist[str(anime["anilist_id"])] = i
 
-    index_anilist = {}
-    index_tmdb = {}
+            tmdb = anime.get("tmdb")
+            if tmdb and tmdb.get("id"):
+                index_tmdb[str(tmdb["id"])] = i
+
+            enriched.write(anime)
+            if shards:
+                shards.write(anime)
+            if sqlite:
+                sqlite.write(anime)
 
-    for i, anime in enumerate(enriched):
-        index_anilist[str(anime["anilist_id"])] = i
+        # aborta os writers: os arquivos finais anteriores ficam intactos
+        if invalid:
+            raise RuntimeError(f"{invalid} animes inválidos no schema final")
 
-        tmdb = anime.get("tmdb")
-        if tmdb and tmdb.get("id"):
-            index_tmdb[str(tmdb["id"])] = i
+        log("Salvando arquivos finais...")
 
+    log("Gerando indexes...")
     save_json(INDEX_ANILIST, index_anilist)
     save_json(INDEX_TMDB, index_tmdb)
 
+    if COMPRESSED_ARTIFACTS:
+        write_artifacts([OUT_ENRICHED, OUT_NO_TMDB, OUT_NOT_MATCHED, INDEX_ANILIST, INDEX_TMDB])
+
     # ======================================================
     # SUMMARY
     # ======================================================
 
     log("✔ MAPPER FINALIZADO")
-    log(f"✔ Enriquecidos (válidos): {len(enriched)}")
-    log(f"⚠ MATCHED sem TMDB: {len(no_tmdb)}")
-    log(f"❌ Não match: {len(not_matched)}")
+    log(f"✔ Enriquecidos (válidos): {enriched.count}")
+    log(f"⚠ MATCHED sem TMDB: {no_tmdb.count}")
+    log(f"❌ Não match: {not_matched.count}")
+    if shards:
+        log(f"✔ Shards: {shards.count} animes em {SHARDS_DIR}")
+    if sqlite:
+        log(f"✔ SQLite: {sqlite.count} animes em {SQLITE_FILE}")
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def main():
+    if not exists(INPUT_FILE):
+        raise FileNotFoundError(INPUT_FILE)
+
+    log("Carregando dados...")
+    export(read_records(INPUT_FILE))
 
 # ==========================================================
 # ENTRYPOINT
@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
 import json
 import time
 import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.franchise import RELATION_TYPES
+from utils.http_cache import get_default_cache
+from utils.jsonl import exists, read_records, write_records
+from utils.rate_limiter import TokenBucket, parse_retry_after
 
 # ==========================================================
 # CONFIG
@@ -13,7 +23,8 @@ from typing import List, Dict, Any
 ANILIST_API = "https://graphql.anilist.co"
 
 OUTPUT_DIR = "data/raw"
-OUTPUT_FILE = os.path.join(OUTPUT_DIR, "anilist_raw.json")
+OUTPUT_FILE = os.path.join(OUTPUT_DIR, "anilist_raw.jsonl")
+STATE_FILE = os.path.join(OUTPUT_DIR, "anilist_sync_state.json")
 
 HEADERS = {
     "Content-Type": "application/json",
@@ -21,16 +32,29 @@ HEADERS = {
     "User-Agent": "anime-db-github-action",
 }
 
+# páginas em voo simultâneo (1 = sequencial)
+CONCURRENCY = 3
+
+# limite documentado da AniList (ajustado pelos headers em runtime)
+RATE_LIMIT_PER_MINUTE = 90
+
+# sync incremental via updatedAt (cai para coleta completa sem estado)
+INCREMENTAL = True
+
+# coleta completa periódica (pega remoções / mudanças de isAdult)
+FULL_SYNC_EVERY_DAYS = 30
+
 QUERY = """
-query ($page: Int) {
+query ($page: Int, $sort: [MediaSort]) {
   Page(page: $page, perPage: 50) {
     pageInfo {
       hasNextPage
       currentPage
       lastPage
     }
-    media(type: ANIME, isAdult: false) {
+    media(type: ANIME, isAdult: false, sort: $sort) {
       id
+      updatedAt
       format
       status
       episodes
@@ -43,6 +67,12 @@ query ($page: Int) {
         english
         native
       }
+      relations {
+        edges {
+          relationType
+          node { id type format }
+        }
+      }
     }
   }
 }
@@ -59,8 +89,23 @@ def log(msg: str, level: str = "INFO"):
 # REQUEST (COM RETRY + RATE LIMIT)
 # ==========================================================
 
-def request(payload: Dict[str, Any], retries: int = 6) -> Dict[str, Any]:
+def request(
+    payload: Dict[str, Any],
+    retries: int = 6,
+    limiter: Optional[TokenBucket] = None,
+) -> Dict[str, Any]:
+    cache = get_default_cache()
+    key = cache.key("anilist", payload) if cache else None
+
+    if cache:
+        cached = cache.get(key)
+        if cached and cached.fresh:
+            return cached.body
+
     for attempt in range(1, retries + 1):
+        if limiter:
+            limiter.acquire()
+
         try:
             r = requests.post(
                 ANILIST_API,
@@ -69,13 +114,25 @@ def request(payload: Dict[str, Any], retries: int = 6) -> Dict[str, Any]:
                 timeout=30,
             )
 
+            if limiter:
+                limiter.update_from_headers(r.headers)
+
             if r.status_code == 200:
-                return r.json()
+                data = r.json()
+                if cache and not data.get("errors"):
+                    cache.set(key, "anilist", data)
+                return data
 
             if r.status_code == 429:
-                wait = 10 * attempt
-                log(f"Rate limit 429 — aguardando {wait}s", "WARN")
-                time.sleep(wait)
+                # Retry-After pode vir em segundos ou como HTTP-date
+                wait = parse_retry_after(r.headers.get("Retry-After"))
+                if wait is None:
+                    wait = 10 * attempt
+                log(f"Rate limit 429 — aguardando {wait:.1f}s", "WARN")
+                if limiter:
+                    limiter.pause(wait)
+                else:
+                    time.sleep(wait)
                 continue
 
             r.raise_for_status()
@@ -90,6 +147,23 @@ def request(payload: Dict[str, Any], retries: int = 6) -> Dict[str, Any]:
 # NORMALIZE RAW (BLINDADO)
 # ==========================================================
 
+def normalize_relations(media: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Só PREQUEL/SEQUEL/PARENT entre animes (usadas no matching por franquia).
+    """
+    relations = []
+
+    for edge in (media.get("relations") or {}).get("edges") or []:
+        node = edge.get("node") or {}
+        if edge.get("relationType") in RELATION_TYPES and node.get("type") == "ANIME" and node.get("id"):
+            relations.append({
+                "relation": edge["relationType"],
+                "anilist_id": node["id"],
+                "format": node.get("format"),
+            })
+
+    return relations
+
 def normalize_media(media: Dict[str, Any]) -> Dict[str, Any]:
     title = media.get("title") or {}
 
@@ -116,6 +190,8 @@ def normalize_media(media: Dict[str, Any]) -> Dict[str, Any]:
         "genres": media.get("genres") or [],
         "anilist_score": media.get("averageScore"),
         "popularity": media.get("popularity"),
+        "updated_at": media.get("updatedAt"),
+        "relations": normalize_relations(media),
 
         # placeholder para pipeline
         "match": {
@@ -127,50 +203,184 @@ def normalize_media(media: Dict[str, Any]) -> Dict[str, Any]:
 # FETCH ALL
 # ==========================================================
 
-def fetch_all() -> List[Dict[str, Any]]:
-    page = 1
-    results: List[Dict[str, Any]] = []
+def fetch_page(
+    page: int,
+    limiter: TokenBucket,
+    variables: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    log(f"Coletando página {page}")
+
+    data = request({
+        "query": QUERY,
+        "variables": {**(variables or {}), "page": page},
+    }, limiter=limiter)
+
+    page_data = data.get("data", {}).get("Page")
+    if not page_data:
+        raise RuntimeError("Resposta inválida da AniList")
+
+    return page_data
+
+def iter_pages(
+    concurrency: int = CONCURRENCY,
+    variables: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Busca páginas com até `concurrency` requisições em voo,
+    entregando sempre na ordem das páginas.
+    """
+    limiter = TokenBucket(RATE_LIMIT_PER_MINUTE)
+    concurrency = max(1, concurrency)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {}
+        next_page = 1
+
+        # janela especulativa: total de páginas é desconhecido
+        for _ in range(concurrency):
+            pending[next_page] = pool.submit(fetch_page, next_page, limiter, variables)
+            next_page += 1
+
+        page = 1
+        try:
+            while True:
+                page_data = pending.pop(page).result()
+                yield page_data
+
+                if not page_data.get("pageInfo", {}).get("hasNextPage"):
+                    break
+
+                pending[next_page] = pool.submit(fetch_page, next_page, limiter, variables)
+                next_page += 1
+                page += 1
+        finally:
+            # consumidor parou (fim ou sync incremental): descarta o resto
+            for future in pending.values():
+                future.cancel()
+
+def iter_all(concurrency: int = CONCURRENCY) -> Iterator[Dict[str, Any]]:
+    for page_data in iter_pages(concurrency):
+        for media in page_data.get("media") or []:
+            yield normalize_media(media)
+
+def fetch_all(concurrency: int = CONCURRENCY) -> List[Dict[str, Any]]:
+    return list(iter_all(concurrency))
+
+# ==========================================================
+# INCREMENTAL SYNC (updatedAt)
+# ==========================================================
+
+def fetch_updated_since(since: int, concurrency: int = CONCURRENCY) -> List[Dict[str, Any]]:
+    """
+    Percorre a AniList em UPDATED_AT_DESC até passar do high-water mark.
+    """
+    delta: List[Dict[str, Any]] = []
+    pages = iter_pages(concurrency, {"sort": ["UPDATED_AT_DESC"]})
+
+    try:
+        for page_data in pages:
+            reached = False
+
+            for media in page_data.get("media") or []:
+                # mantém itens no mesmo segundo do último sync (>=)
+                if (media.get("updatedAt") or 0) < since:
+                    reached = True
+                    break
+                delta.append(normalize_media(media))
+
+            if reached:
+                break
+    finally:
+        pages.close()
+
+    return delta
+
+def merge_delta(
+    animes: Iterable[Dict[str, Any]],
+    delta: List[Dict[str, Any]],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Substitui os atualizados na posição original e acrescenta os novos no fim.
+    """
+    by_id = {a["anilist_id"]: a for a in delta}
+
+    for anime in animes:
+        yield by_id.pop(anime["anilist_id"], anime)
 
-    while True:
-        log(f"Coletando página {page}")
+    added = len(by_id)
+    yield from by_id.values()
 
-        data = request({
-            "query": QUERY,
-            "variables": {"page": page},
-        })
+    log(f"Delta: {len(delta)} ({added} novos, {len(delta) - added} atualizados)")
 
-        page_data = data.get("data", {}).get("Page")
-        if not page_data:
-            raise RuntimeError("Resposta inválida da AniList")
+def high_water_mark(animes: List[Dict[str, Any]], previous: int = 0) -> int:
+    return max([previous] + [a.get("updated_at") or 0 for a in animes])
 
-        media_list = page_data.get("media") or []
+def load_state() -> Dict[str, Any]:
+    if not os.path.exists(STATE_FILE):
+        return {}
 
-        for media in media_list:
-            results.append(normalize_media(media))
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-        if not page_data.get("pageInfo", {}).get("hasNextPage"):
-            break
+def save_state(state: Dict[str, Any]):
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
 
-        page += 1
-        time.sleep(0.8)
+def can_sync_incremental(state: Dict[str, Any]) -> bool:
+    if not INCREMENTAL or not state.get("updated_at"):
+        return False
 
-    return results
+    if not exists(OUTPUT_FILE):
+        return False
+
+    age_days = (time.time() - state.get("full_synced_at", 0)) / 86400
+    return age_days < FULL_SYNC_EVERY_DAYS
 
 # ==========================================================
 # MAIN
 # ==========================================================
 
+def iter_records(state: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Catálogo completo em streaming (incremental ou full); `state` é
+    atualizado com o novo high-water mark ao fim da iteração.
+    """
+    if can_sync_incremental(state):
+        log(f"Sincronização incremental (updatedAt >= {state['updated_at']})")
+        delta = fetch_updated_since(state["updated_at"])
+
+        yield from merge_delta(read_records(OUTPUT_FILE), delta)
+
+        state["updated_at"] = high_water_mark(delta, state["updated_at"])
+        return
+
+    log("Iniciando coleta do AniList...")
+    mark = 0
+
+    for anime in iter_all():
+        mark = max(mark, anime.get("updated_at") or 0)
+        yield anime
+
+    state.clear()
+    state.update({
+        "updated_at": mark,
+        "full_synced_at": int(time.time()),
+    })
+
 def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    log("Iniciando coleta do AniList...")
-    animes = fetch_all()
+    state = load_state()
+    total = write_records(OUTPUT_FILE, iter_records(state))
+
+    save_state(state)
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(animes, f, ensure_ascii=False, indent=2)
+    cache = get_default_cache()
+    if cache:
+        cache.log_stats()
 
     log(f"✔ Arquivo salvo: {OUTPUT_FILE}")
-    log(f"✔ Total coletado: {len(animes)}")
+    log(f"✔ Total coletado: {total}")
 
 if __name__ == "__main__":
     main()
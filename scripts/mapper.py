@@ -1,23 +1,32 @@
 # -*- coding: utf-8 -*-
 
-import json
 import os
-from jsonschema import validate, ValidationError
+import sys
+from typing import Dict, Iterable, Iterator
 
 # ==========================================================
 # CONFIG
 # ==========================================================
 
-VALIDATE = False  # ⚠️ Termux = False | GitHub Actions = True
+# validador compilado (utils/validation.py): barato o bastante para Termux
+VALIDATE = True
+
+# registros mapeados e validados por lote
+VALIDATE_BATCH_SIZE = 500
 
 # ==========================================================
 # PATHS
 # ==========================================================
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.jsonl import exists, read_records, write_records
+from utils.parallel import chunked
+from utils.validation import get_validator
 
-INPUT_FILE = os.path.join(ROOT_DIR, "data", "raw", "anilist_raw.json")
-OUTPUT_FILE = os.path.join(ROOT_DIR, "data", "processed", "anilist_mapped.json")
+INPUT_FILE = os.path.join(ROOT_DIR, "data", "raw", "anilist_raw.jsonl")
+OUTPUT_FILE = os.path.join(ROOT_DIR, "data", "processed", "anilist_mapped.jsonl")
 SCHEMA_FILE = os.path.join(ROOT_DIR, "schemas", "anime.schema.json")
 
 # ==========================================================
@@ -42,50 +51,52 @@ def map_anime(raw: dict) -> dict:
         "genres": raw.get("genres", []),
         "anilist_score": raw.get("anilist_score"),
         "popularity": raw.get("popularity"),
+        "relations": raw.get("relations", []),
         "match": raw.get("match", {"status": "NOT_PROCESSED"}),
     }
 
 # ==========================================================
-# MAIN
+# STREAM
 # ==========================================================
 
-def main():
-    log("Carregando AniList raw")
-
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        raw_animes = json.load(f)
-
-    schema = None
-    if VALIDATE:
-        log("Carregando schema")
-        with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
-            schema = json.load(f)
-
-    mapped = []
+def process(raw_animes: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Mapeia (e valida, se VALIDATE) em lotes, mantendo a ordem.
+    Registros inválidos são descartados com todos os erros no log.
+    """
+    validator = get_validator(SCHEMA_FILE) if VALIDATE else None
+    processed = mapped = 0
 
-    for i, anime in enumerate(raw_animes, start=1):
-        mapped_anime = map_anime(anime)
+    for batch in chunked(raw_animes, VALIDATE_BATCH_SIZE):
+        mapped_batch = [map_anime(anime) for anime in batch]
+        errors = validator.validate_batch(mapped_batch) if validator else [[]] * len(batch)
 
-        if VALIDATE:
-            try:
-                validate(instance=mapped_anime, schema=schema)
-            except ValidationError as e:
+        for mapped_anime, errs in zip(mapped_batch, errors):
+            if errs:
                 log(
-                    f"Schema inválido para AniList {anime.get('anilist_id')}: {e.message}",
+                    f"Schema inválido para AniList {mapped_anime.get('anilist_id')}: {'; '.join(errs)}",
                     "ERROR"
                 )
                 continue
 
-        mapped.append(mapped_anime)
+            mapped += 1
+            yield mapped_anime
 
-        if i % 500 == 0:
-            log(f"Processados: {i}")
+        processed += len(batch)
+        log(f"Processados: {processed}")
 
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(mapped, f, ensure_ascii=False, indent=2)
+    log(f"✔ Mapeados: {mapped}/{processed}")
 
-    log(f"✔ Mapeados: {len(mapped)}")
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def main():
+    if not exists(INPUT_FILE):
+        raise FileNotFoundError(INPUT_FILE)
+
+    log("Carregando AniList raw")
+    write_records(OUTPUT_FILE, process(read_records(INPUT_FILE)))
 
 if __name__ == "__main__":
     main()
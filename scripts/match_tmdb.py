@@ -4,25 +4,95 @@ import json
 import os
 import sys
 import time
+import hashlib
+import re
+from collections import Counter
+from datetime import date
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, ROOT_DIR)
 
+from utils.checkpoint import Journal
+from utils.franchise import FranchiseGraph
+from utils.jsonl import exists, read_records, write_records
 from utils.normalizer import TitleNormalizer
+from utils.parallel import imap_ordered
+from utils.progress import Progress
 from utils.similarity import TitleSimilarity
 from utils.tmdb_client import TMDBClient
+from utils.tmdb_index import TMDBTitleIndex, get_default_index
 
 # ==========================================================
 # CONFIG
 # ==========================================================
 
-INPUT_FILE = "data/processed/anilist_normalized.json"
-OUTPUT_FILE = "data/processed/animes_matched.json"
+INPUT_FILE = "data/processed/anilist_normalized.jsonl"
+OUTPUT_FILE = "data/processed/animes_matched.jsonl"
 
 SCORE_THRESHOLD = 0.75
 FAST_MATCH_THRESHOLD = 0.92
 DELAY_BETWEEN_REQUESTS = 0.1
 
+# animes casados em paralelo (1 = sequencial); ordem de saída é mantida
+MATCH_WORKERS = 8
+
+# registros lidos à frente do que já foi escrito (memória limitada)
+MATCH_WINDOW = MATCH_WORKERS * 4
+
+# retoma do journal de checkpoint se a execução anterior caiu
+RESUME = True
+
+# reaproveita o match anterior quando os títulos normalizados não mudaram
+REUSE_PREVIOUS_MATCHES = True
+
+# NOT_FOUND / NOT_MATCHED são refeitos depois desse prazo
+RETRY_UNMATCHED_AFTER_DAYS = 28
+
+# consulta o índice local (scripts/build_tmdb_index.py) antes do /search
+USE_LOCAL_INDEX = True
+
+# hit local só é aceito com tipo (tv/movie) e ano compatíveis com o AniList;
+# candidatos do índice examinados por variante
+LOCAL_CANDIDATES = 5
+LOCAL_YEAR_TOLERANCE = 1
+
+# ordem padrão das variantes de título buscadas; reordenada pela taxa de
+# acerto de cada variante no run anterior (título da variante × match.tmdb_title
+# em OUTPUT_FILE)
+VARIANT_ORDER = ("english", "romaji", "native")
+LEARN_VARIANT_ORDER = True
+
+# matches com título TMDB registrado necessários para confiar no aprendizado
+MIN_VARIANT_SAMPLES = 50
+
+# formato AniList → /search/tv ou /search/movie (com ano); os demais
+# (OVA, ONA, SPECIAL, MUSIC...) vão para /search/multi
+TYPED_SEARCH = {"TV": "tv", "TV_SHORT": "tv", "MOVIE": "movie"}
+
+# para de buscar variantes quando o melhor candidato passa de
+# DOMINANCE_MIN_SCORE com essa folga sobre a segunda obra
+DOMINANCE_MIN_SCORE = 0.85
+DOMINANCE_MARGIN = 0.15
+
+# candidato cujo limite superior (LCS, barato) fica abaixo disso não muda
+# nenhuma decisão: não passa do SCORE_THRESHOLD nem fica a menos de
+# DOMINANCE_MARGIN de um dominante. O score exato (difflib) só é calculado
+# se ele for necessário para o NOT_MATCHED
+PRUNE_BELOW = min(SCORE_THRESHOLD, DOMINANCE_MIN_SCORE - DOMINANCE_MARGIN)
+
+# temporadas TV seguintes (AniList relations) herdam o match TV da raiz
+# da franquia sem buscar: "X Season 2" / "X Part 2" são a mesma série.
+# Só quando o título confirma (similar à raiz, ou título da raiz + marcador
+# de temporada); "Naruto Shippuden" (PREQUEL Naruto) é buscado normalmente
+USE_FRANCHISE = True
+
+# sufixos (já normalizados) que indicam só uma nova temporada
+SEASON_MARKER_RE = re.compile(
+    r"^(\d+(st|nd|rd|th)?|[ivx]+|final|season\d+|part\d+|cour\d+|第?\d+期)$"
+)
+
 # ==========================================================
 # LOG
 # ==========================================================
@@ -43,32 +113,258 @@ def get_display_title(anime: dict) -> str:
         or f"AniList {anime['anilist_id']}"
     )
 
-def get_search_titles(anime: dict) -> list[str]:
+def get_search_variants(anime: dict, order: Iterable[str] = VARIANT_ORDER) -> List[Tuple[str, str]]:
+    """
+    (variante, título normalizado) na ordem dada, sem títulos repetidos.
+    """
     titles = anime.get("_normalized", {})
     search = []
+    seen = set()
 
-    if titles.get("english"):
-        search.append(titles["english"])
-    if titles.get("romaji") and titles["romaji"] not in search:
-        search.append(titles["romaji"])
-    if titles.get("native") and titles["native"] not in search:
-        search.append(titles["native"])
+    for variant in order:
+        title = titles.get(variant)
+        if title and title not in seen:
+            seen.add(title)
+            search.append((variant, title))
 
     return search
 
+def title_fingerprint(anime: dict) -> str:
+    titles = anime.get("_normalized", {})
+    payload = json.dumps(titles, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+# ==========================================================
+# PREVIOUS RUN (REUSO + ORDEM DAS VARIANTES)
+# ==========================================================
+
+class VariantStats:
+    """
+    Taxa de acerto por variante de título: matches em que o título da
+    variante passa de SCORE_THRESHOLD contra o título TMDB casado /
+    matches em que ela estava disponível.
+
+    Todas as variantes disponíveis são comparadas, não só a que foi
+    buscada primeiro: contar apenas match.variant favoreceria a variante
+    que já estava na frente da ordem.
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.available = Counter()
+        self.wins = Counter()
+        self.scores = Counter()
+
+    def add(self, anime: dict):
+        match = anime.get("match") or {}
+        tmdb_title = match.get("tmdb_title")
+
+        # franquia / runs antigos não têm título TMDB para comparar
+        if match.get("status") != "MATCHED" or not tmdb_title:
+            return
+
+        tmdb_title_norm = TitleNormalizer.normalize(tmdb_title)
+        if not tmdb_title_norm:
+            return
+
+        self.samples += 1
+        for variant, title in get_search_variants(anime):
+            score = TitleSimilarity.score(title, tmdb_title_norm)
+            self.available[variant] += 1
+            if score >= SCORE_THRESHOLD:
+                self.wins[variant] += 1
+                self.scores[variant] += score
+
+    def rate(self, variant: str) -> float:
+        return self.wins[variant] / self.available[variant] if self.available[variant] else 0.0
+
+    def order(self) -> Tuple[str, ...]:
+        if self.samples < MIN_VARIANT_SAMPLES:
+            return VARIANT_ORDER
+
+        # sorted é estável: empate mantém a ordem padrão
+        return tuple(sorted(VARIANT_ORDER, key=self.rate, reverse=True))
+
+    def summary(self) -> str:
+        return " | ".join(
+            f"{v} {self.rate(v):.0%} (score médio {self.scores[v] / self.wins[v]:.2f})"
+            if self.wins[v] else f"{v} 0%"
+            for v in VARIANT_ORDER
+        )
+
+def load_previous_run() -> Tuple[dict, Tuple[str, ...]]:
+    """
+    (matches anteriores por anilist_id, ordem das variantes aprendida),
+    numa única leitura de OUTPUT_FILE.
+    """
+    matches = {}
+    stats = VariantStats()
+
+    if not exists(OUTPUT_FILE) or not (REUSE_PREVIOUS_MATCHES or LEARN_VARIANT_ORDER):
+        return matches, VARIANT_ORDER
+
+    for anime in read_records(OUTPUT_FILE):
+        if REUSE_PREVIOUS_MATCHES:
+            matches[anime["anilist_id"]] = anime.get("match") or {}
+        if LEARN_VARIANT_ORDER:
+            stats.add(anime)
+
+    if not LEARN_VARIANT_ORDER:
+        return matches, VARIANT_ORDER
+
+    order = stats.order()
+    log(f"Acerto por variante no run anterior: {stats.summary()} → ordem {', '.join(order)}")
+    return matches, order
+
+def can_reuse(previous: dict, fingerprint: str) -> bool:
+    if not previous or previous.get("fingerprint") != fingerprint:
+        return False
+
+    if previous.get("status") == "MATCHED":
+        return True
+
+    if previous.get("status") in ("NOT_FOUND", "NOT_MATCHED"):
+        try:
+            matched_at = date.fromisoformat(previous.get("matched_at", ""))
+        except ValueError:
+            return False
+        return (date.today() - matched_at).days < RETRY_UNMATCHED_AFTER_DAYS
+
+    return False
+
 # ==========================================================
 # MATCHING
 # ==========================================================
 
-def find_best_match(anime: dict, client: TMDBClient) -> dict:
-    candidates = []
+def local_compatible(anime: dict, hit: dict) -> bool:
+    """
+    Ano da entrada do índice compatível com o do AniList. Sem ano no
+    índice (entrada só do export diário) não dá para conferir: recusa.
+    Temporadas seguintes só exigem que a série TMDB não seja posterior.
+    """
+    year = anime.get("year")
+    if not year:
+        return True
+
+    hit_year = hit.get("year")
+    if not hit_year:
+        return False
+
+    if hit["media_type"] == "tv" and has_prequel(anime):
+        return hit_year <= year + LOCAL_YEAR_TOLERANCE
+
+    return abs(hit_year - year) <= LOCAL_YEAR_TOLERANCE
+
+def match_local(anime: dict, index: TMDBTitleIndex, order: Iterable[str] = VARIANT_ORDER):
+    """
+    Match direto pelo índice local; só aceita candidatos no nível "fast",
+    do tipo esperado pelo formato AniList e com ano compatível.
+    """
+    media_type = TYPED_SEARCH.get(anime.get("format"))
+
+    for variant, title in get_search_variants(anime, order):
+        for hit in index.search(title, limit=LOCAL_CANDIDATES, media_type=media_type):
+            if hit["score"] < FAST_MATCH_THRESHOLD:
+                break
+            if not local_compatible(anime, hit):
+                continue
+
+            return {
+                "status": "MATCHED",
+                "tmdb_id": hit["id"],
+                "media_type": hit["media_type"],
+                "method": "local_index",
+                "score": round(hit["score"], 3),
+                "variant": variant,
+                "tmdb_title": hit["title"],
+            }
+
+    return None
+
+def has_prequel(anime: dict) -> bool:
+    return any(r.get("relation") in ("PREQUEL", "PARENT") for r in anime.get("relations") or [])
+
+def plan_searches(anime: dict, order: Iterable[str] = VARIANT_ORDER) -> Tuple[List[tuple], Optional[tuple]]:
+    """
+    Buscas (variante, título, endpoint, ano) na ordem de execução e a busca
+    de reserva. Com formato conhecido, os endpoints tipados filtram pelo
+    ano (só na primeira temporada: o first_air_date de uma série TV é o da
+    estreia); a reserva é um /search/multi sem ano da melhor variante, para
+    formato/ano divergentes entre AniList e TMDB.
+    """
+    variants = get_search_variants(anime, order)
+    kind = TYPED_SEARCH.get(anime.get("format"))
+
+    if not kind or not variants:
+        return [(v, t, "multi", None) for v, t in variants], None
+
+    year = anime.get("year")
+    if kind == "tv" and has_prequel(anime):
+        year = None
+
+    plan = [(v, t, kind, year) for v, t in variants]
+    return plan, (variants[0][0], variants[0][1], "multi", None)
+
+def run_search(client: TMDBClient, endpoint: str, title: str, year: Optional[int]) -> List[Dict]:
+    if endpoint == "tv":
+        return client.search_tv(title, year)
+    if endpoint == "movie":
+        return client.search_movie(title, year)
+    return client.search_multi(title)
+
+def dominant(candidates: Dict[tuple, dict]) -> Optional[dict]:
+    """
+    Melhor candidato se ele já decide o match: acima do DOMINANCE_MIN_SCORE
+    e com DOMINANCE_MARGIN sobre a segunda obra (ou sem concorrente).
+    """
+    ranked = sorted(candidates.values(), key=lambda c: c["score"], reverse=True)
+    if not ranked or ranked[0]["score"] < DOMINANCE_MIN_SCORE:
+        return None
+    if len(ranked) > 1 and ranked[0]["score"] - ranked[1]["score"] < DOMINANCE_MARGIN:
+        return None
+    return ranked[0]
+
+def find_best_match(anime: dict, client: TMDBClient, order: Iterable[str] = VARIANT_ORDER) -> dict:
+    index = get_default_index() if USE_LOCAL_INDEX else None
+    if index:
+        local = match_local(anime, index, order)
+        if local:
+            return local
+
+    # fallback: busca na API, uma variante por vez até um candidato decidir
+    plan, reserve = plan_searches(anime, order)
+    candidates: Dict[tuple, dict] = {}
+    pruned: List[tuple] = []
+
+    # throttle só entre buscas que foram à rede (memo / cache HTTP não esperam)
+    network = False
+
+    # ordem da primeira aparição de cada obra: desempate entre scores iguais
+    first_seen: Dict[tuple, int] = {}
+
+    def matched(c: dict, method: str) -> dict:
+        return {
+            "status": "MATCHED",
+            "tmdb_id": c["tmdb_id"],
+            "media_type": c["media_type"],
+            "method": method,
+            "score": round(c["score"], 3),
+            "variant": c["variant"],
+            "search": c["search"],
+            "tmdb_title": c["title"],
+        }
 
-    for title in get_search_titles(anime):
-        log(f"Buscando TMDB: {title}")
+    while plan:
+        variant, title, endpoint, year = plan.pop(0)
 
-        results = client.search_multi(title)[:5]
+        if network:
+            time.sleep(DELAY_BETWEEN_REQUESTS)
 
-        for r in results:
+        sent = client.sent_in_thread()
+        results = run_search(client, endpoint, title, year)
+        network = client.sent_in_thread() > sent
+
+        for r in results[:5]:
             media_type = r.get("media_type")
             if media_type not in ("tv", "movie"):
                 continue
@@ -78,39 +374,56 @@ def find_best_match(anime: dict, client: TMDBClient) -> dict:
                 continue
 
             tmdb_title_norm = TitleNormalizer.normalize(tmdb_title)
-            score = TitleSimilarity.score(title, tmdb_title_norm)
+            key = (media_type, r["id"])
+            first_seen.setdefault(key, len(first_seen))
 
-            if score >= FAST_MATCH_THRESHOLD:
-                return {
-                    "status": "MATCHED",
-                    "tmdb_id": r["id"],
-                    "media_type": media_type,
-                    "method": "title_similarity_fast",
-                    "score": round(score, 3),
-                }
-
-            candidates.append({
+            candidate = {
                 "tmdb_id": r["id"],
                 "media_type": media_type,
                 "title": tmdb_title,
-                "score": score,
-            })
+                "score": None,
+                "variant": variant,
+                "search": endpoint,
+            }
 
-        time.sleep(DELAY_BETWEEN_REQUESTS)
+            if TitleSimilarity.score_upper_bound(title, tmdb_title_norm) < PRUNE_BELOW:
+                pruned.append((title, tmdb_title_norm, candidate))
+                continue
+
+            score = candidate["score"] = TitleSimilarity.score(title, tmdb_title_norm)
+
+            if score >= FAST_MATCH_THRESHOLD:
+                return matched(candidate, "title_similarity_fast")
 
-    if not candidates:
+            if score > candidates.get(key, {}).get("score", -1):
+                candidates[key] = candidate
+
+        if dominant(candidates):
+            break
+
+        # tipadas esgotadas sem candidato aceitável: tenta a reserva
+        if not plan and reserve and not any(c["score"] >= SCORE_THRESHOLD for c in candidates.values()):
+            plan, reserve = [reserve], None
+
+    if not candidates and not pruned:
         return {"status": "NOT_FOUND"}
 
-    best = max(candidates, key=lambda x: x["score"])
+    def earliest(c: dict) -> int:
+        return first_seen[(c["media_type"], c["tmdb_id"])]
 
-    if best["score"] >= SCORE_THRESHOLD:
-        return {
-            "status": "MATCHED",
-            "tmdb_id": best["tmdb_id"],
-            "media_type": best["media_type"],
-            "method": "title_similarity",
-            "score": round(best["score"], 3),
-        }
+    if candidates:
+        best = max(sorted(candidates.values(), key=earliest), key=lambda x: x["score"])
+        if best["score"] >= SCORE_THRESHOLD:
+            return matched(best, "title_similarity")
+
+    # nenhum aceito: score exato dos podados, só para reportar o melhor
+    for title, tmdb_title_norm, candidate in pruned:
+        candidate["score"] = TitleSimilarity.score(title, tmdb_title_norm)
+
+    best = max(
+        sorted(list(candidates.values()) + [c for _, _, c in pruned], key=earliest),
+        key=lambda x: x["score"],
+    )
 
     return {
         "status": "NOT_MATCHED",
@@ -118,39 +431,187 @@ def find_best_match(anime: dict, client: TMDBClient) -> dict:
         "score": round(best["score"], 3),
     }
 
+def season_similarity(title: str, root_title: str) -> float:
+    """
+    Similaridade entre o título da sequência e o da raiz; 1.0 quando é o
+    título da raiz seguido apenas de marcadores de temporada.
+    """
+    rest = title[len(root_title):]
+    if title.startswith(root_title) and rest[:1] in ("", " "):
+        if all(SEASON_MARKER_RE.match(w) for w in rest.split()):
+            return 1.0
+
+    return TitleSimilarity.score(title, root_title)
+
+def franchise_similarity(anime: dict, root_titles: dict) -> float:
+    """
+    Melhor similaridade entre variantes equivalentes (english × english...).
+    """
+    titles = anime.get("_normalized", {})
+    scores = [
+        season_similarity(titles[v], root_titles[v])
+        for v in VARIANT_ORDER
+        if titles.get(v) and root_titles.get(v)
+    ]
+    return max(scores, default=0.0)
+
+def franchise_match(anime: dict, root_result: dict, root_id: int, root_titles: dict) -> dict:
+    """
+    Match herdado da raiz; None se a raiz não casou com uma série TV ou se
+    o título não confirma que é a mesma série.
+    """
+    if not root_result or root_result.get("status") != "MATCHED":
+        return None
+    if root_result.get("media_type") != "tv":
+        return None
+
+    similarity = franchise_similarity(anime, root_titles)
+    if similarity < SCORE_THRESHOLD:
+        return None
+
+    # score fica vazio: não houve comparação com o título TMDB deste registro
+    return {
+        "status": "MATCHED",
+        "tmdb_id": root_result["tmdb_id"],
+        "media_type": "tv",
+        "method": "franchise",
+        "score": None,
+        "franchise_root": root_id,
+        "franchise_similarity": round(similarity, 3),
+    }
+
+# ==========================================================
+# STREAM
+# ==========================================================
+
+def process(animes: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Casa registro a registro, na ordem de entrada, com até MATCH_WORKERS
+    buscas em paralelo. O journal é removido quando o stream termina.
+    """
+    # configuração que muda o resultado: journal de outra config é descartado
+    journal = Journal("match", meta={
+        "score_threshold": SCORE_THRESHOLD,
+        "fast_match_threshold": FAST_MATCH_THRESHOLD,
+        "local_index": USE_LOCAL_INDEX,
+        "franchise": USE_FRANCHISE,
+    })
+    done = journal.load() if RESUME else {}
+    if done:
+        log(f"Retomando checkpoint: {len(done)} já processados")
+
+    previous, order = load_previous_run()
+    today = date.today().isoformat()
+
+    # raízes de franquia: o resultado de cada uma é publicado num Future
+    # que as sequências esperam (a raiz foi submetida antes, então já está
+    # rodando ou pronta quando a sequência começa)
+    graph = FranchiseGraph()
+    roots: Dict[int, Future] = {}
+    root_titles: Dict[int, dict] = {}
+    franchise_of: Dict[int, int] = {}
+
+    def register(animes: Iterable[Dict]) -> Iterator[Dict]:
+        # roda na thread principal, na ordem do stream, antes do submit
+        for anime in animes:
+            # normalize titles (reaproveita o que normalize_titles.py já gerou)
+            if "_normalized" not in anime:
+                anime["_normalized"] = TitleNormalizer.normalize_all(anime["titles"])
+
+            root = graph.register(anime) if USE_FRANCHISE else None
+            if root == anime["anilist_id"]:
+                roots[root] = Future()
+                root_titles[root] = anime["_normalized"]
+            elif root is not None:
+                franchise_of[anime["anilist_id"]] = root
+            yield anime
+
+    def resolve(anime: dict):
+        fingerprint = title_fingerprint(anime)
+
+        # mesma regra do reuso: títulos mudaram ou NOT_FOUND venceu → refaz
+        if can_reuse(done.get(anime["anilist_id"]), fingerprint):
+            return done[anime["anilist_id"]], "resumed"
+
+        prev = previous.get(anime["anilist_id"])
+        if can_reuse(prev, fingerprint):
+            return prev, "reused"
+
+        result, origin = None, "matched"
+
+        root = franchise_of.get(anime["anilist_id"])
+        if root is not None:
+            result = franchise_match(anime, roots[root].result(), root, root_titles[root])
+            origin = "franchise"
+
+        if result is None:
+            result, origin = find_best_match(anime, client, order), "matched"
+
+        result["fingerprint"] = fingerprint
+        result["matched_at"] = today
+        return result, origin
+
+    def match_one(anime: dict):
+        future = roots.get(anime["anilist_id"])
+        try:
+            result, origin = resolve(anime)
+        except BaseException:
+            if future:
+                future.set_result(None)
+            raise
+
+        if future:
+            future.set_result(result)
+        return result, origin
+
+    progress = Progress(None, log)
+    total = matched = reused = inherited = searched = 0
+
+    with TMDBClient(pool_size=MATCH_WORKERS) as client, journal.open(resume=RESUME):
+        with ThreadPoolExecutor(max_workers=MATCH_WORKERS) as pool:
+            for anime, (result, origin) in imap_ordered(pool, match_one, register(animes), MATCH_WINDOW):
+                anime["match"] = result
+                total += 1
+
+                if origin in ("matched", "franchise"):
+                    journal.append(anime["anilist_id"], result)
+                    progress.step()
+                    if origin == "franchise":
+                        inherited += 1
+                    else:
+                        searched += 1
+                elif origin == "reused":
+                    reused += 1
+
+                if result.get("status") == "MATCHED":
+                    matched += 1
+
+                yield anime
+
+        progress.finish()
+        if searched:
+            log(f"Buscas por anime (fora reuso/franquia): {client.searches.calls / searched:.2f}")
+        client.log_stats()
+
+    if previous:
+        log(f"Reaproveitados do run anterior: {reused} | casados: {progress.done}")
+    if USE_FRANCHISE:
+        log(f"Herdados da franquia (sem busca): {inherited} | séries TV raiz: {len(roots)}")
+    log(f"✔ MATCHED: {matched}/{total}")
+    if client.cache:
+        client.cache.log_stats()
+
+    journal.remove()
+
 # ==========================================================
 # MAIN
 # ==========================================================
 
 def main():
-    if not os.path.exists(INPUT_FILE):
+    if not exists(INPUT_FILE):
         raise FileNotFoundError(INPUT_FILE)
 
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        animes = json.load(f)
-
-    # normalize titles
-    for anime in animes:
-        anime["_normalized"] = TitleNormalizer.normalize_all(anime["titles"])
-
-    client = TMDBClient()
-    matched = 0
-
-    for i, anime in enumerate(animes, 1):
-        log(f"[{i}/{len(animes)}] {get_display_title(anime)}")
-
-        result = find_best_match(anime, client)
-        anime["match"] = result
-
-        if result["status"] == "MATCHED":
-            matched += 1
-
-    log(f"✔ MATCHED: {matched}/{len(animes)}")
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(animes, f, ensure_ascii=False, indent=2)
-
+    write_records(OUTPUT_FILE, process(read_records(INPUT_FILE)))
     log(f"Arquivo salvo em {OUTPUT_FILE}")
 
 if __name__ == "__main__":
@@ -1,9 +1,8 @@
 # -*- coding: utf-8 -*-
 
-import json
 import os
 import sys
-from typing import Dict
+from typing import Dict, Iterable, Iterator
 
 # ==========================================================
 # FIX PYTHON PATH (CI / GITHUB ACTIONS)
@@ -12,6 +11,7 @@ from typing import Dict
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, ROOT_DIR)
 
+from utils.jsonl import exists, read_records, write_records
 from utils.normalizer import TitleNormalizer
 
 # ==========================================================
@@ -19,11 +19,11 @@ from utils.normalizer import TitleNormalizer
 # ==========================================================
 
 INPUT_FILE = os.path.join(
-    ROOT_DIR, "data", "processed", "anilist_mapped.json"
+    ROOT_DIR, "data", "processed", "anilist_mapped.jsonl"
 )
 
 OUTPUT_FILE = os.path.join(
-    ROOT_DIR, "data", "processed", "anilist_normalized.json"
+    ROOT_DIR, "data", "processed", "anilist_normalized.jsonl"
 )
 
 # ==========================================================
@@ -53,28 +53,27 @@ def normalize_anime(anime: Dict) -> Dict:
 
     return anime
 
+def process(animes: Iterable[Dict]) -> Iterator[Dict]:
+    count = 0
+
+    for count, anime in enumerate(animes, start=1):
+        yield normalize_anime(anime)
+
+        if count % 500 == 0:
+            log(f"Processados: {count}")
+
+    log(f"✔ Normalizados: {count}")
+
 # ==========================================================
 # MAIN
 # ==========================================================
 
 def main():
-    if not os.path.exists(INPUT_FILE):
+    if not exists(INPUT_FILE):
         raise FileNotFoundError(INPUT_FILE)
 
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        animes = json.load(f)
-
-    log(f"Normalizando títulos de {len(animes)} animes...")
-
-    for i, anime in enumerate(animes, start=1):
-        normalize_anime(anime)
-
-        if i % 500 == 0:
-            log(f"Processados: {i}")
-
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(animes, f, ensure_ascii=False, indent=2)
+    log("Normalizando títulos...")
+    write_records(OUTPUT_FILE, process(read_records(INPUT_FILE)))
 
     log(f"✔ Arquivo salvo em {OUTPUT_FILE}")
 
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import enrich_tmdb
+import export_json
+import fetch_anilist
+import mapper
+import match_tmdb
+import normalize_titles
+from utils.jsonl import exists, open_writer, read_records
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+STAGES = ("fetch", "map", "normalize", "match", "enrich", "export")
+
+# módulo de cada etapa com arquivo de saída (OUTPUT_FILE = entrada da seguinte)
+MODULES = {
+    "fetch": fetch_anilist,
+    "map": mapper,
+    "normalize": normalize_titles,
+    "match": match_tmdb,
+    "enrich": enrich_tmdb,
+}
+
+TRANSFORMS = {
+    "map": mapper.process,
+    "normalize": normalize_titles.process,
+    "match": match_tmdb.process,
+    "enrich": enrich_tmdb.process,
+}
+
+# padrão de --keep: saídas lidas pelo próximo run (sync incremental,
+# reuso de match/enrich); sem elas o reaproveitamento para de funcionar
+MATERIALIZE = ("fetch", "match", "enrich")
+
+# ==========================================================
+# LOG
+# ==========================================================
+
+def log(msg, level="INFO"):
+    print(f"[PIPELINE][{level}] {msg}", flush=True)
+
+# ==========================================================
+# STREAM
+# ==========================================================
+
+def output_file(stage: str) -> str:
+    return MODULES[stage].OUTPUT_FILE
+
+def tee(records: Iterable[Dict], path: str) -> Iterator[Dict]:
+    """
+    Repassa o stream gravando cada registro em `path`; o arquivo só
+    substitui o anterior se o stream terminar sem erro.
+    """
+    with open_writer(path) as writer:
+        for record in records:
+            writer.write(record)
+            yield record
+
+def fetch_source(persist: bool) -> Iterator[Dict]:
+    state = fetch_anilist.load_state()
+    stream = fetch_anilist.iter_records(state)
+
+    if not persist:
+        # raw não gravado: o high-water mark também não avança
+        yield from stream
+        return
+
+    yield from tee(stream, output_file("fetch"))
+    fetch_anilist.save_state(state)
+
+def file_source(first: str) -> Iterator[Dict]:
+    path = output_file(STAGES[STAGES.index(first) - 1])
+    if not exists(path):
+        raise FileNotFoundError(f"{path} (rode as etapas anteriores ou ajuste --from)")
+
+    return read_records(path)
+
+def build(first: str, last: str, keep: set) -> Iterator[Dict]:
+    """
+    Encadeia as etapas [first, last] como geradores sobre um único stream.
+    """
+    stages = STAGES[STAGES.index(first):STAGES.index(last) + 1]
+
+    if first == "fetch":
+        stream = fetch_source("fetch" in keep)
+    else:
+        stream = file_source(first)
+
+    for stage in stages:
+        if stage in TRANSFORMS:
+            stream = TRANSFORMS[stage](stream)
+            if stage in keep:
+                stream = tee(stream, output_file(stage))
+
+    return stream
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline AniList → TMDB num único processo")
+    parser.add_argument("--from", dest="first", choices=STAGES, default=STAGES[0])
+    parser.add_argument("--to", dest="last", choices=STAGES, default=STAGES[-1])
+    parser.add_argument(
+        "--keep",
+        nargs="+",
+        default=list(MATERIALIZE),
+        metavar="ETAPA",
+        help=f"etapas intermediárias gravadas em disco: {', '.join(MODULES)}, all ou none "
+             f"(padrão: {' '.join(MATERIALIZE)})",
+    )
+
+    args = parser.parse_args(argv)
+
+    if STAGES.index(args.first) > STAGES.index(args.last):
+        parser.error("--from deve vir antes de --to")
+
+    if "all" in args.keep:
+        args.keep = set(MODULES)
+    elif "none" in args.keep:
+        args.keep = set()
+    else:
+        unknown = set(args.keep) - set(MODULES)
+        if unknown:
+            parser.error(f"etapas desconhecidas em --keep: {', '.join(sorted(unknown))}")
+        args.keep = set(args.keep)
+
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+
+    stages = STAGES[STAGES.index(args.first):STAGES.index(args.last) + 1]
+
+    # última etapa do intervalo sempre é gravada
+    keep = (args.keep | {args.last}) & set(MODULES) & set(stages)
+
+    log(f"Etapas: {' → '.join(stages)} | gravando: {', '.join(s for s in stages if s in keep) or '-'}")
+    stream = build(args.first, args.last, keep)
+
+    if args.last == "export":
+        export_json.export(stream)
+    else:
+        total = sum(1 for _ in stream)
+        log(f"✔ {total} registros em {output_file(args.last)}")
+
+    log(f"✔ Pipeline concluído em {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.blocking import CandidateBlocker, media_type_for_format
+from utils.jsonl import exists, read_records
+from utils.similarity import TitleSimilarity
+from utils.similarity_batch import BatchTitleScorer, require_numpy
+from utils.tmdb_index import INDEX_FILE, TMDBTitleIndex
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+INPUT_FILE = os.path.join(ROOT_DIR, "data", "processed", "anilist_normalized.jsonl")
+
+# matches atuais servem de amostra rotulada para medir o recall do bloqueio
+LABELS_FILE = os.path.join(ROOT_DIR, "data", "processed", "animes_matched.jsonl")
+
+OUTPUT_FILE = os.path.join(ROOT_DIR, "data", "processed", "rematch_offline.json")
+
+SCORE_THRESHOLD = 0.75
+
+# "blocking" (LSH + scorer exato) | "numpy" (matrizes em blocos, exige numpy)
+SCORER = "blocking"
+
+# ==========================================================
+# LOG
+# ==========================================================
+
+def log(msg, level="INFO"):
+    print(f"[REMATCH][{level}] {msg}", flush=True)
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def to_record(anime: dict) -> dict:
+    return {
+        "titles": list(dict.fromkeys((anime.get("_normalized") or {}).values())),
+        "year": anime.get("year"),
+        "media_type": media_type_for_format(anime.get("format")),
+    }
+
+def load_labels(animes: list, index: TMDBTitleIndex) -> dict:
+    if not exists(LABELS_FILE):
+        return {}
+
+    target_pos = {(e["media_type"], e["id"]): i for i, e in enumerate(index.entries)}
+    record_pos = {a["anilist_id"]: i for i, a in enumerate(animes)}
+
+    labels = {}
+    for anime in read_records(LABELS_FILE):
+        match = anime.get("match") or {}
+        if match.get("status") != "MATCHED":
+            continue
+
+        target = target_pos.get((match.get("media_type"), match.get("tmdb_id")))
+        record = record_pos.get(anime["anilist_id"])
+        if target is not None and record is not None:
+            labels[record] = target
+
+    return labels
+
+# ==========================================================
+# SCORERS
+# ==========================================================
+
+def rematch_blocking(animes: list, records: list, index: TMDBTitleIndex):
+    started = time.perf_counter()
+    blocker = CandidateBlocker(index.entries)
+    log(f"Bloqueio construído em {time.perf_counter() - started:.1f}s")
+
+    results = {}
+    scored_pairs = 0
+
+    for idx, cands in blocker.pairs(records):
+        best = None
+
+        for query in records[idx]["titles"]:
+            for target_idx in cands:
+                entry = index.entries[target_idx]
+                score = max(TitleSimilarity.score_many(query, entry["titles"]))
+                scored_pairs += 1
+
+                if not best or score > best["score"]:
+                    best = {"tmdb_id": entry["id"], "media_type": entry["media_type"], "score": score}
+
+        if best and best["score"] >= SCORE_THRESHOLD:
+            results[str(animes[idx]["anilist_id"])] = best
+
+    log(f"Scoring: {scored_pairs} pares")
+    return results, blocker
+
+def rematch_numpy(animes: list, records: list, index: TMDBTitleIndex):
+    owners, targets = [], []
+    for i, entry in enumerate(index.entries):
+        for title in entry["titles"]:
+            owners.append(i)
+            targets.append(title)
+
+    queries, query_owner = [], []
+    for i, record in enumerate(records):
+        for title in record["titles"]:
+            queries.append(title)
+            query_owner.append(i)
+
+    scorer = BatchTitleScorer(targets)
+    log(f"Matrizes: {len(queries)} × {len(targets)} títulos")
+
+    results = {}
+    for owner, ranked in zip(query_owner, scorer.top_k(queries, k=5)):
+        key = str(animes[owner]["anilist_id"])
+
+        for target_idx, score in ranked:
+            entry = index.entries[owners[target_idx]]
+            if score >= SCORE_THRESHOLD and score > results.get(key, {}).get("score", 0):
+                results[key] = {"tmdb_id": entry["id"], "media_type": entry["media_type"], "score": score}
+
+    return results, None
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def main():
+    # falha antes de carregar catálogo e índice
+    if SCORER == "numpy":
+        require_numpy()
+
+    if not os.path.exists(INDEX_FILE):
+        raise FileNotFoundError(f"{INDEX_FILE} (rode scripts/build_tmdb_index.py)")
+
+    animes = list(read_records(INPUT_FILE))
+    index = TMDBTitleIndex.load(INDEX_FILE)
+    records = [to_record(a) for a in animes]
+
+    log(f"{len(records)} animes × {len(index)} títulos TMDB")
+
+    started = time.perf_counter()
+
+    if SCORER == "numpy":
+        results, blocker = rematch_numpy(animes, records, index)
+    else:
+        results, blocker = rematch_blocking(animes, records, index)
+
+    log(f"{len(results)} matches em {time.perf_counter() - started:.1f}s")
+
+    # recall só faz sentido para o bloqueio
+    labels = load_labels(animes, index) if blocker else {}
+    if labels:
+        report = blocker.recall(records, labels)
+        log(
+            f"Recall do bloqueio: {report['recall']:.2%} ({report['labeled']} rotulados) | "
+            f"pares {report['pairs']} de {report['all_pairs']} "
+            f"(redução {report['reduction']:.4%})"
+        )
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    log(f"✔ Arquivo salvo em {OUTPUT_FILE}")
+
+if __name__ == "__main__":
+    main()
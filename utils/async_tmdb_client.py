@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, List, Optional
+
+from utils.http_cache import HTTPCache
+from utils.rate_limiter import TokenBucket, parse_retry_after
+from utils import tmdb_client
+from utils.tmdb_client import TMDBClient, log
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+TOKEN_RATE_PER_MINUTE = 600     # orçamento por token
+TOKEN_CONCURRENCY = 4           # requisições simultâneas por token
+PARK_SECONDS = 10               # 429 sem Retry-After
+
+# ==========================================================
+# TOKEN SLOT
+# ==========================================================
+
+class _TokenSlot:
+    def __init__(self, index: int, session: requests.Session, rate_per_minute: float, concurrency: int):
+        self.index = index
+        self.session = session
+        self.bucket = TokenBucket(rate_per_minute)
+        self.concurrency = concurrency
+        self.in_flight = 0
+
+    def headroom(self) -> float:
+        return (self.concurrency - self.in_flight) + self.bucket.tokens
+
+# ==========================================================
+# ASYNC CLIENT
+# ==========================================================
+
+class AsyncTMDBClient(TMDBClient):
+    """
+    Mesma superfície do TMDBClient (search_* / enrich), em asyncio.
+    Cada token tem orçamento próprio; a requisição vai para o token com
+    mais folga e um token que recebe 429 fica estacionado até liberar.
+    A chamada HTTP e o cache (SQLite + zlib) rodam no executor, fora do
+    event loop.
+
+    O cliente fica ligado a um único event loop: o do primeiro uso com
+    `await`, ou o loop próprio (thread em background) usado por submit(),
+    que é como as etapas síncronas (enrich_tmdb) o usam.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        timeout: int = 15,
+        retries: int = 3,
+        cache: Optional[HTTPCache] = None,
+        rate_per_minute: float = TOKEN_RATE_PER_MINUTE,
+        per_token_concurrency: int = TOKEN_CONCURRENCY,
+    ):
+        super().__init__(
+            timeout=timeout,
+            retries=retries,
+            cache=cache,
+            pool_size=per_token_concurrency,
+        )
+
+        self.concurrency = concurrency
+        self.slots = [
+            _TokenSlot(i, session, rate_per_minute, per_token_concurrency)
+            for i, session in enumerate(self.sessions)
+        ]
+
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._slot_changed: Optional[asyncio.Condition] = None
+        self._bound_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    def close(self):
+        if self._loop is not None:
+            # requisições ainda em voo são canceladas antes de parar o loop
+            asyncio.run_coroutine_threadsafe(self._cancel_pending(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self._loop = None
+
+        self._executor.shutdown(wait=True)
+        super().close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def _primitives(self):
+        # criados no loop em execução; Semaphore/Condition não podem
+        # atravessar loops
+        loop = asyncio.get_running_loop()
+
+        if self._bound_loop is None:
+            self._bound_loop = loop
+            self._limit = asyncio.Semaphore(self.concurrency)
+            self._slot_changed = asyncio.Condition()
+        elif self._bound_loop is not loop:
+            raise RuntimeError("AsyncTMDBClient já está ligado a outro event loop")
+
+        return self._limit, self._slot_changed
+
+    # ======================================================
+    # SYNC BRIDGE
+    # ======================================================
+
+    @staticmethod
+    async def _cancel_pending():
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """
+        Agenda a corrotina no loop próprio do cliente (thread em
+        background) e devolve um concurrent.futures.Future.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="tmdb-async", daemon=True
+                )
+                self._loop_thread.start()
+
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # ======================================================
+    # DISPATCH
+    # ======================================================
+
+    async def _acquire_slot(self) -> _TokenSlot:
+        _, changed = self._primitives()
+
+        async with changed:
+            while True:
+                waits = []
+
+                for slot in sorted(self.slots, key=_TokenSlot.headroom, reverse=True):
+                    if slot.in_flight >= slot.concurrency:
+                        continue
+
+                    wait = slot.bucket.try_acquire()
+                    if wait <= 0:
+                        slot.in_flight += 1
+                        return slot
+                    waits.append(wait)
+
+                # nenhum token com folga: espera liberar vaga ou orçamento
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=min(waits) if waits else None)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release_slot(self, slot: _TokenSlot):
+        _, changed = self._primitives()
+
+        async with changed:
+            slot.in_flight -= 1
+            changed.notify_all()
+
+    def _park(self, slot: _TokenSlot, r: requests.Response):
+        wait = parse_retry_after(r.headers.get("Retry-After"))
+        if wait is None:
+            wait = PARK_SECONDS
+        slot.bucket.pause(wait)
+        log(f"429 no token #{slot.index + 1} → estacionado por {wait:.1f}s", "WARN")
+
+    # ======================================================
+    # REQUEST
+    # ======================================================
+
+    async def _request(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        refresh: bool = False,
+    ) -> Optional[Dict]:
+        limit, _ = self._primitives()
+        loop = asyncio.get_running_loop()
+
+        key, cached = await loop.run_in_executor(self._executor, self._cache_lookup, endpoint, params)
+
+        # refresh: ignora a validade e revalida (ETag) com o TMDB
+        if cached and cached.fresh and not refresh:
+            return cached.body
+
+        async with limit:
+            for attempt in range(1, self.retries + 1):
+                slot = await self._acquire_slot()
+
+                try:
+                    r = await loop.run_in_executor(
+                        self._executor, self._send, slot.session, endpoint, params, cached
+                    )
+                except requests.RequestException as e:
+                    log(f"Erro conexão ({attempt}): {e}", "WARN")
+                    await asyncio.sleep(1.2 * attempt)
+                    continue
+                finally:
+                    await self._release_slot(slot)
+
+                data = await loop.run_in_executor(self._executor, self._accept, r, endpoint, key, cached)
+                if data is not None:
+                    return data
+
+                if r.status_code == 429:
+                    # outro token assume sem esperar
+                    self._park(slot, r)
+                    continue
+
+                log(f"HTTP {r.status_code} em {endpoint}", "WARN")
+                await asyncio.sleep(1.2 * attempt)
+
+        return None
+
+    # ======================================================
+    # SEARCH / ENRICH
+    # ======================================================
+
+    async def _search(self, endpoint: str, params: Dict[str, Any]) -> List[Dict]:
+        key = self._search_key(endpoint, params)
+        data = await self.searches.acall(key, lambda: self._request(endpoint, params))
+        return data.get("results", []) if data else []
+
+    async def search_multi(self, query: str, language: str = "en-US") -> List[Dict]:
+        return await self._search("/search/multi", {
+            "query": query,
+            "include_adult": False,
+            "language": language,
+        })
+
+    async def search_tv(self, query: str, year: Optional[int] = None, language: str = "en-US") -> List[Dict]:
+        params = self._typed_params(query, language, "first_air_date_year", year)
+        return self._typed(await self._search("/search/tv", params), "tv")
+
+    async def search_movie(self, query: str, year: Optional[int] = None, language: str = "en-US") -> List[Dict]:
+        params = self._typed_params(query, language, "year", year)
+        return self._typed(await self._search("/search/movie", params), "movie")
+
+    async def enrich(self, tmdb_id: int, media_type: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        endpoint = f"/{media_type}/{tmdb_id}"
+
+        if tmdb_client.ENRICH_WITH_TRANSLATIONS:
+            base = await self._request(endpoint, self._translated_params(), refresh)
+            return self._build_from_translations(base, media_type)
+
+        params = {
+            "append_to_response": tmdb_client.ENRICH_APPEND,
+            "language": "en-US",
+        }
+
+        base, localized, fallback = await asyncio.gather(
+            self._request(endpoint, params, refresh),
+            self._request(endpoint, {**params, "language": "pt-BR"}, refresh),
+            self._request(endpoint, {**params, "language": "ja-JP"}, refresh),
+        )
+        if not base:
+            return None
+
+        return {
+            "tmdb": self._normalize(base, media_type),
+            "tmdb_localized": self._normalize(localized, media_type),
+            "tmdb_fallback": self._normalize(fallback, media_type),
+        }
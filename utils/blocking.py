@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+import zlib
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+# AniList format → tipo TMDB (None = aceita ambos)
+FORMAT_MEDIA_TYPE = {
+    "TV": "tv",
+    "TV_SHORT": "tv",
+    "ONA": "tv",
+    "MOVIE": "movie",
+}
+
+YEAR_TOLERANCE = 1
+
+# MinHash/LSH: 16 bandas × 2 linhas → pares com Jaccard de trigramas ≳ 0.25
+LSH_BANDS = 16
+LSH_ROWS = 2
+
+# token "raro" = aparece em no máximo isso de títulos alvo
+RARE_TOKEN_MAX_DF = 50
+
+_PRIME = (1 << 61) - 1
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def media_type_for_format(fmt: Optional[str]) -> Optional[str]:
+    return FORMAT_MEDIA_TYPE.get(fmt or "")
+
+def _shingles(text: str) -> Set[int]:
+    padded = f" {text} "
+    grams = {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+    return {zlib.crc32(g.encode("utf-8")) for g in grams}
+
+def _hash_params(count: int) -> List[Tuple[int, int]]:
+    # determinístico entre execuções (não usa hash() do Python)
+    params = []
+    seed = 0x9E3779B97F4A7C15
+    for _ in range(count):
+        seed = (seed * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+        a = (seed >> 3) % _PRIME or 1
+        seed = (seed * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+        b = (seed >> 3) % _PRIME
+        params.append((a, b))
+    return params
+
+# ==========================================================
+# BLOCKER
+# ==========================================================
+
+class CandidateBlocker:
+    """
+    Pré-filtro para matching em massa: em vez de N·M pares, só emite pares
+    que compartilham uma banda LSH (MinHash de trigramas) ou um token raro,
+    e que são compatíveis em tipo (format → tv/movie) e ano (± tolerância).
+
+    Alvos e registros: {"titles": [normalizados...], "year": int|None,
+    "media_type": "tv"|"movie"|None}.
+    """
+
+    def __init__(
+        self,
+        targets: List[Dict[str, Any]],
+        bands: int = LSH_BANDS,
+        rows: int = LSH_ROWS,
+        year_tolerance: int = YEAR_TOLERANCE,
+        rare_token_max_df: int = RARE_TOKEN_MAX_DF,
+    ):
+        self.targets = targets
+        self.bands = bands
+        self.rows = rows
+        self.year_tolerance = year_tolerance
+        self._hashes = _hash_params(bands * rows)
+        self._shingle_hashes: Dict[int, Tuple[int, ...]] = {}
+
+        self._lsh: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._tokens: Dict[str, List[int]] = defaultdict(list)
+
+        df: Counter = Counter()
+        for idx, target in enumerate(targets):
+            tokens = {tok for title in target["titles"] for tok in title.split()}
+            df.update(tokens)
+
+            for key in self._band_keys(target["titles"]):
+                self._lsh[key].append(idx)
+            for tok in tokens:
+                self._tokens[tok].append(idx)
+
+        self.rare_tokens = {tok for tok, n in df.items() if n <= rare_token_max_df}
+
+    # ======================================================
+    # SIGNATURES
+    # ======================================================
+
+    def _signature(self, title: str) -> List[int]:
+        # hashes por trigrama são memoizados: o vocabulário de trigramas é pequeno
+        table = self._shingle_hashes
+        rows = []
+        for s in _shingles(title):
+            hashed = table.get(s)
+            if hashed is None:
+                hashed = table[s] = tuple((a * s + b) % _PRIME for a, b in self._hashes)
+            rows.append(hashed)
+
+        return list(map(min, zip(*rows)))
+
+    def _band_keys(self, titles: Iterable[str]) -> Set[Tuple[int, int]]:
+        keys = set()
+        for title in titles:
+            sig = self._signature(title)
+            for band in range(self.bands):
+                chunk = tuple(sig[band * self.rows:(band + 1) * self.rows])
+                keys.add((band, hash(chunk)))
+        return keys
+
+    # ======================================================
+    # COMPATIBILITY
+    # ======================================================
+
+    def _compatible(self, record: Dict[str, Any], target: Dict[str, Any]) -> bool:
+        rtype, ttype = record.get("media_type"), target.get("media_type")
+        if rtype and ttype and rtype != ttype:
+            return False
+
+        ryear, tyear = record.get("year"), target.get("year")
+        if ryear and tyear and abs(ryear - tyear) > self.year_tolerance:
+            return False
+
+        return True
+
+    # ======================================================
+    # CANDIDATES
+    # ======================================================
+
+    def candidates(self, record: Dict[str, Any]) -> Set[int]:
+        found: Set[int] = set()
+
+        for key in self._band_keys(record["titles"]):
+            found.update(self._lsh.get(key, ()))
+
+        for title in record["titles"]:
+            for tok in title.split():
+                if tok in self.rare_tokens:
+                    found.update(self._tokens[tok])
+
+        return {i for i in found if self._compatible(record, self.targets[i])}
+
+    def pairs(self, records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, List[int]]]:
+        """
+        (índice do registro, índices dos alvos candidatos).
+        """
+        for idx, record in enumerate(records):
+            yield idx, sorted(self.candidates(record))
+
+    # ======================================================
+    # RECALL
+    # ======================================================
+
+    def recall(
+        self,
+        records: List[Dict[str, Any]],
+        labels: Dict[int, int],
+    ) -> Dict[str, Any]:
+        """
+        labels: índice do registro → índice do alvo correto.
+        Mede quantos pares corretos sobrevivem ao bloqueio e a redução de pares.
+        """
+        kept = 0
+        total_pairs = 0
+
+        for idx, record in enumerate(records):
+            cands = self.candidates(record)
+            total_pairs += len(cands)
+            if idx in labels and labels[idx] in cands:
+                kept += 1
+
+        all_pairs = len(records) * len(self.targets)
+        return {
+            "labeled": len(labels),
+            "recall": round(kept / len(labels), 4) if labels else None,
+            "pairs": total_pairs,
+            "all_pairs": all_pairs,
+            "reduction": round(1 - total_pairs / all_pairs, 6) if all_pairs else None,
+        }
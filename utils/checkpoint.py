@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CHECKPOINT_DIR = os.path.join(ROOT_DIR, "data", "cache", "checkpoints")
+
+# journal mais velho que isso é de outra execução (data/cache é restaurado
+# entre runs do CI): descartado em vez de retomado
+CHECKPOINT_MAX_AGE_HOURS = 24
+
+# ==========================================================
+# JOURNAL (APPEND-ONLY JSONL)
+# ==========================================================
+
+class Journal:
+    """
+    Journal append-only por anilist_id.
+    Primeira linha: {"journal": {"meta": ..., "created": ...}}; as demais:
+    {"anilist_id": ..., "data": {...}}. Só é retomado com o mesmo `meta`
+    (configuração da etapa) e dentro de CHECKPOINT_MAX_AGE_HOURS; fora
+    disso é descartado. Em caso de crash, a última linha pode estar
+    truncada e é ignorada.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        meta: Optional[Dict[str, Any]] = None,
+        flush_every: int = 50,
+        flush_interval: float = 10.0,
+    ):
+        self.path = os.path.join(CHECKPOINT_DIR, f"{name}.jsonl")
+        self.meta = meta or {}
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self._file = None
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _valid(self) -> bool:
+        """
+        Journal existente é desta execução (mesmo meta, dentro do prazo).
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline()).get("journal")
+        except (OSError, ValueError, AttributeError):
+            return False
+
+        if not isinstance(header, dict) or header.get("meta") != self.meta:
+            return False
+
+        age_hours = (time.time() - header.get("created", 0)) / 3600
+        return age_hours < CHECKPOINT_MAX_AGE_HOURS
+
+    def load(self) -> Dict[Any, Any]:
+        done: Dict[Any, Any] = {}
+
+        if not os.path.exists(self.path) or not self._valid():
+            return done
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.readline()  # cabeçalho
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # linha truncada pelo crash
+                done[entry["anilist_id"]] = entry["data"]
+
+        return done
+
+    def open(self, resume: bool = True) -> "Journal":
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+
+        resume = resume and os.path.exists(self.path) and self._valid()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+        if not resume:
+            header = {"journal": {"meta": self.meta, "created": int(time.time())}}
+            self._file.write(json.dumps(header, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+        # isola uma linha truncada do append seguinte
+        if resume and self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+        return self
+
+    def append(self, anilist_id: Any, data: Any):
+        line = json.dumps({"anilist_id": anilist_id, "data": data}, ensure_ascii=False)
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._pending += 1
+
+            now = time.monotonic()
+            if self._pending >= self.flush_every or now - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._pending = 0
+                self._last_flush = now
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        """
+        Etapa concluída: o journal não é mais necessário.
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
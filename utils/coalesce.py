@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# ==========================================================
+# COALESCER
+# ==========================================================
+
+class RequestCoalescer:
+    """
+    Deduplica chamadas idênticas dentro de uma execução:
+    - chave em voo: quem chega depois espera o mesmo resultado;
+    - chave concluída: devolvida de um LRU limitado.
+
+    Resultado None conta como falha: é repassado a quem estava esperando,
+    mas não é memorizado (a próxima chamada tenta de novo).
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+
+        self._memo: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.executed = 0
+        self.memo_hits = 0
+        self.joined = 0
+
+    # ======================================================
+    # MEMO
+    # ======================================================
+
+    def _lookup(self, key: Hashable):
+        """
+        (achou, valor) no LRU; chamado com o lock.
+        """
+        self.calls += 1
+
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            self.memo_hits += 1
+            return True, self._memo[key]
+
+        return False, None
+
+    def _store(self, key: Hashable, value: Any):
+        if value is None or self.maxsize <= 0:
+            return
+
+        self._memo[key] = value
+        while len(self._memo) > self.maxsize:
+            self._memo.popitem(last=False)
+
+    # ======================================================
+    # SYNC (threads)
+    # ======================================================
+
+    def call(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.executed += 1
+            else:
+                self.joined += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._store(key, value)
+        future.set_result(value)
+
+        return value
+
+    # ======================================================
+    # ASYNC (asyncio)
+    # ======================================================
+
+    async def acall(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = asyncio.get_running_loop().create_future()
+                self.executed += 1
+            else:
+                self.joined += 1
+
+        if not owner:
+            # shield: cancelar um dos que esperam não cancela os outros
+            return await asyncio.shield(future)
+
+        try:
+            value = await fn()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            # ninguém esperando: evita "exception was never retrieved"
+            future.exception()
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._store(key, value)
+        future.set_result(value)
+
+        return value
+
+    # ======================================================
+    # STATS
+    # ======================================================
+
+    @property
+    def saved(self) -> int:
+        return self.memo_hits + self.joined
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "memo_hits": self.memo_hits,
+            "joined": self.joined,
+            "saved": self.saved,
+        }
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import os
+import time
+from typing import Dict, Iterable, List
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - opcional
+    zstandard = None
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+# níveis máximos: o custo é pago uma vez no export, não pelos consumidores
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+ZSTD_LEVEL = 19
+
+# ==========================================================
+# CODECS
+# ==========================================================
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0: mesma entrada → mesmos bytes (sem diff falso no git)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+def _zstd(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+CODECS = {
+    "gz": _gzip,
+    "br": _brotli if brotli else None,
+    "zst": _zstd if zstandard else None,
+}
+
+def available(formats: Iterable[str]) -> List[str]:
+    return [fmt for fmt in formats if CODECS.get(fmt)]
+
+# ==========================================================
+# COMPRESS
+# ==========================================================
+
+def compress_file(path: str, formats: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Grava <path>.<fmt> para cada formato disponível, a partir dos bytes
+    já escritos (sem re-serializar). Irmãos de formatos indisponíveis são
+    removidos para não servir uma versão desatualizada.
+
+    Retorna {"identity"|fmt: {"bytes": int, "seconds": float}}.
+    """
+    formats = set(formats)
+
+    with open(path, "rb") as f:
+        data = f.read()
+
+    report = {"identity": {"bytes": len(data), "seconds": 0.0}}
+
+    for fmt in CODECS:
+        target = f"{path}.{fmt}"
+        codec = CODECS[fmt] if fmt in formats else None
+
+        if not codec:
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+
+        started = time.perf_counter()
+        packed = codec(data)
+        elapsed = time.perf_counter() - started
+
+        tmp = f"{target}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(packed)
+        os.replace(tmp, target)
+
+        report[fmt] = {"bytes": len(packed), "seconds": round(elapsed, 3)}
+
+    return report
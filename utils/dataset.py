@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+import glob
+import hashlib
+import json
+import mmap
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+# animes com anilist_id em [n·SHARD_ID_RANGE, (n+1)·SHARD_ID_RANGE) vão para o shard n
+SHARD_ID_RANGE = 20000
+
+INDEX_NAME = "index.json"
+
+# shards levam o hash do conteúdo no nome: um export novo nunca sobrescreve
+# arquivos que o índice publicado ainda referencia, e um shard que não mudou
+# mantém o nome (sem churn no git nem URL quebrada para quem consome)
+SHARD_PATTERN = "animes-{:04d}-{}.jsonl"
+SHARD_TMP_PATTERN = "animes-{:04d}.jsonl.tmp"
+SHARD_GLOB = "animes-*.jsonl"
+
+# caracteres hex do sha1 usados no nome do shard e na geração
+DIGEST_SIZE = 12
+
+# leituras do índice quando um export novo troca os shards no meio da abertura
+OPEN_ATTEMPTS = 3
+
+# ==========================================================
+# WRITER
+# ==========================================================
+
+class ShardedDatasetWriter:
+    """
+    Grava registros em shards JSONL por faixa de anilist_id e um índice
+    id → [shard, offset, length] para leitura de um registro sem carregar
+    o catálogo.
+
+    Os shards são gravados em *.tmp e, no close, ganham o nome com o hash
+    do conteúdo (nome novo só se o conteúdo mudou, então o índice publicado
+    nunca tem um arquivo trocado por baixo). O index.json, com a geração
+    (hash dos nomes dos shards), é substituído por último (os.replace
+    atômico) e só então os shards que saíram do índice são removidos.
+    Quem lê vê sempre uma geração inteira: a antiga ou a nova.
+    """
+
+    def __init__(self, directory: str, id_range: int = SHARD_ID_RANGE):
+        self.directory = directory
+        self.id_range = id_range
+        self.generation: Optional[str] = None
+        self.count = 0
+
+        self._files: Dict[int, Any] = {}
+        self._digests: Dict[int, Any] = {}
+        self._by_anilist: Dict[str, List[int]] = {}
+        self._by_tmdb: Dict[str, List[int]] = {}
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _shard_name(self, shard: int) -> str:
+        return SHARD_PATTERN.format(shard, self._digests[shard].hexdigest()[:DIGEST_SIZE])
+
+    def write(self, anime: Dict[str, Any]):
+        anilist_id = anime["anilist_id"]
+        shard = anilist_id // self.id_range
+
+        f = self._files.get(shard)
+        if f is None:
+            f = self._files[shard] = open(os.path.join(self.directory, SHARD_TMP_PATTERN.format(shard)), "wb")
+            self._digests[shard] = hashlib.sha1()
+
+        line = json.dumps(anime, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        offset = f.tell()
+        f.write(line + b"\n")
+        self._digests[shard].update(line + b"\n")
+
+        self._by_anilist[str(anilist_id)] = [shard, offset, len(line)]
+
+        tmdb = anime.get("tmdb") or {}
+        if tmdb.get("id"):
+            key = f"{tmdb.get('media_type')}:{tmdb['id']}"
+            self._by_tmdb.setdefault(key, []).append(anilist_id)
+
+        self.count += 1
+
+    def close(self):
+        if self._files is None:
+            return
+
+        for shard, f in self._files.items():
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+
+            path = os.path.join(self.directory, self._shard_name(shard))
+            if os.path.exists(path):
+                # mesmo hash = mesmo conteúdo: o arquivo publicado fica
+                os.remove(f.name)
+            else:
+                os.replace(f.name, path)
+
+        names = [self._shard_name(s) for s in sorted(self._files)]
+        self.generation = hashlib.sha1("\n".join(names).encode("utf-8")).hexdigest()[:DIGEST_SIZE]
+
+        index = {
+            "generation": self.generation,
+            "id_range": self.id_range,
+            "shards": {str(s): self._shard_name(s) for s in sorted(self._files)},
+            "by_anilist_id": self._by_anilist,
+            "by_tmdb_id": self._by_tmdb,
+        }
+
+        index_path = os.path.join(self.directory, INDEX_NAME)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+
+        # ponto de publicação: a partir daqui os leitores veem a geração nova
+        os.replace(index_path + ".tmp", index_path)
+
+        # shards fora do índice novo; leitores abertos mantêm os
+        # descritores, e no Windows um arquivo em uso fica para o próximo export
+        current = set(index["shards"].values())
+        for path in glob.glob(os.path.join(self.directory, SHARD_GLOB)):
+            if os.path.basename(path) not in current:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        self._files = None
+
+    def abort(self):
+        if self._files is None:
+            return
+
+        for f in self._files.values():
+            f.close()
+            os.remove(f.name)
+
+        self._files = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+
+# ==========================================================
+# READER
+# ==========================================================
+
+class ShardedDataset:
+    """
+    Leitura pontual do dataset em shards: carrega só o índice e lê cada
+    registro por mmap (ou seek, com use_mmap=False) no offset indicado.
+
+    Todos os shards da geração do índice são abertos na criação, então um
+    export novo (que remove a geração anterior) não afeta um leitor já
+    aberto. Se a troca acontece entre ler o índice e abrir os shards, o
+    índice é relido.
+
+        with ShardedDataset("data/final/shards") as ds:
+            ds.get(21)
+            ds.get_by_tmdb(37854, "tv")
+    """
+
+    def __init__(self, directory: str, use_mmap: bool = True):
+        self.directory = directory
+        self.use_mmap = use_mmap
+
+        self._open: Dict[int, Tuple[Any, Optional[mmap.mmap]]] = {}
+
+        for _ in range(OPEN_ATTEMPTS):
+            with open(os.path.join(directory, INDEX_NAME), "r", encoding="utf-8") as f:
+                index = json.load(f)
+
+            try:
+                self._open_shards(index["shards"])
+                break
+            except FileNotFoundError:
+                # geração trocada por outro export: relê o índice
+                self.close()
+        else:
+            raise RuntimeError(f"Dataset em {directory} mudou durante a abertura")
+
+        self.generation: Optional[str] = index.get("generation")
+        self._by_anilist: Dict[str, List[int]] = index["by_anilist_id"]
+        self._by_tmdb: Dict[str, List[int]] = index["by_tmdb_id"]
+
+    def _open_shards(self, shards: Dict[str, str]):
+        for shard, name in shards.items():
+            f = open(os.path.join(self.directory, name), "rb")
+            self._open[int(shard)] = (f, None)
+
+    def __len__(self) -> int:
+        return len(self._by_anilist)
+
+    def __contains__(self, anilist_id: int) -> bool:
+        return str(anilist_id) in self._by_anilist
+
+    def ids(self) -> List[int]:
+        return [int(i) for i in self._by_anilist]
+
+    def _shard(self, shard: int) -> Tuple[Any, Optional[mmap.mmap]]:
+        f, mm = self._open[shard]
+        if mm is None and self.use_mmap:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._open[shard] = (f, mm)
+        return f, mm
+
+    def _read(self, shard: int, offset: int, length: int) -> bytes:
+        f, mm = self._shard(shard)
+        if mm is not None:
+            return mm[offset:offset + length]
+
+        f.seek(offset)
+        return f.read(length)
+
+    def get(self, anilist_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._by_anilist.get(str(anilist_id))
+        if not entry:
+            return None
+        return json.loads(self._read(*entry))
+
+    def get_by_tmdb(self, tmdb_id: int, media_type: str) -> List[Dict[str, Any]]:
+        """
+        Vários animes podem apontar para a mesma obra TMDB (temporadas).
+        """
+        return [self.get(i) for i in self._by_tmdb.get(f"{media_type}:{tmdb_id}", [])]
+
+    def close(self):
+        for f, mm in self._open.values():
+            if mm is not None:
+                mm.close()
+            f.close()
+        self._open.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
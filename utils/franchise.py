@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, Optional
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+# relações trazidas do AniList (fetch_anilist.QUERY)
+RELATION_TYPES = ("PREQUEL", "SEQUEL", "PARENT")
+
+# relações seguidas em direção à raiz; PARENT fica de fora: no AniList ela
+# liga side stories / spin-offs à série principal, que são outra obra
+ROOT_RELATIONS = ("PREQUEL",)
+
+# formatos em que temporadas seguintes são a mesma obra no TMDB
+FRANCHISE_FORMATS = ("TV",)
+
+# ==========================================================
+# GRAPH
+# ==========================================================
+
+class FranchiseGraph:
+    """
+    Raiz de franquia por anilist_id, resolvida em streaming: cada registro
+    aponta para a raiz do seu PREQUEL TV já registrado (cadeias
+    S3 → S2 → S1 colapsam em S1). Depende de a raiz chegar antes da
+    sequência, o que vale para a ordem do AniList (IDs crescentes; novos
+    itens do sync incremental vão para o fim); quando não chega, o
+    registro vira a própria raiz e é casado normalmente.
+    """
+
+    def __init__(self):
+        self._root: Dict[int, int] = {}
+
+    def register(self, anime: Dict[str, Any]) -> Optional[int]:
+        """
+        Raiz do anime (o próprio ID se ele é raiz) ou None se o formato
+        não participa de franquias.
+        """
+        anilist_id = anime.get("anilist_id")
+        if anime.get("format") not in FRANCHISE_FORMATS:
+            return None
+
+        root = anilist_id
+        relations = anime.get("relations") or []
+
+        for kind in ROOT_RELATIONS:
+            parent = next(
+                (
+                    r["anilist_id"] for r in relations
+                    if r.get("relation") == kind and r.get("anilist_id") in self._root
+                ),
+                None,
+            )
+            if parent is not None:
+                root = self._root[parent]
+                break
+
+        self._root[anilist_id] = root
+        return root
+
+    def root(self, anilist_id: int) -> Optional[int]:
+        return self._root.get(anilist_id)
+
+    def __len__(self) -> int:
+        return len(self._root)
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CACHE_ENABLED = True
+CACHE_FILE = os.path.join(ROOT_DIR, "data", "cache", "http_cache.sqlite")
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# TTL por prefixo de endpoint (segundos) — prefixo mais longo vence
+ENDPOINT_TTLS = {
+    "anilist": 20 * 3600,          # sync semanal sempre revalida
+    "/search/": 14 * 86400,
+    "/tv/": 7 * 86400,
+    "/movie/": 14 * 86400,
+    "/genre/": 30 * 86400,
+    "/tv/changes": 3600,
+    "/movie/changes": 3600,
+}
+DEFAULT_TTL = 7 * 86400
+
+# ==========================================================
+# LOG
+# ==========================================================
+
+def log(msg: str, level: str = "INFO"):
+    print(f"[CACHE][{level}] {msg}")
+
+# ==========================================================
+# ENTRY
+# ==========================================================
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, body: Any, etag: Optional[str], last_modified: Optional[str], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+# ==========================================================
+# CACHE (SQLITE)
+# ==========================================================
+
+class HTTPCache:
+    """
+    Cache HTTP persistente em SQLite.
+    Chave = endpoint + params canônicos; corpo JSON comprimido (zlib).
+    Eviction LRU por tamanho total; revalidação via ETag/Last-Modified.
+    """
+
+    def __init__(self, path: str = CACHE_FILE, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.stores = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)"
+        )
+        self._conn.commit()
+
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._total_bytes = row[0]
+
+    # ======================================================
+    # KEYS / TTL
+    # ======================================================
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        canonical = json.dumps(params or {}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(f"{endpoint}?{canonical}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def ttl_for(endpoint: str) -> int:
+        best = None
+        for prefix in ENDPOINT_TTLS:
+            if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return ENDPOINT_TTLS[best] if best else DEFAULT_TTL
+
+    # ======================================================
+    # READ / WRITE
+    # ======================================================
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if not row:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+
+        entry = CacheEntry(
+            json.loads(zlib.decompress(row[0])),
+            row[1],
+            row[2],
+            row[3],
+        )
+
+        # stale sem validador = miss; com validador o chamador revalida
+        with self._lock:
+            if entry.fresh:
+                self.hits += 1
+            elif not entry.etag and not entry.last_modified:
+                self.misses += 1
+                return None
+            else:
+                self.stale += 1
+
+        return entry
+
+    def set(
+        self,
+        key: str,
+        endpoint: str,
+        body: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        blob = zlib.compress(json.dumps(body, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, endpoint, body, size, etag, last_modified, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, endpoint, blob, len(blob), etag, last_modified,
+                 now + self.ttl_for(endpoint), now),
+            )
+
+            self._total_bytes += len(blob) - (old[0] if old else 0)
+            self.stores += 1
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+            self._conn.commit()
+
+    def refresh(self, key: str, endpoint: str):
+        """
+        304 Not Modified: estende a validade sem regravar o corpo.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?",
+                (now + self.ttl_for(endpoint), now, key),
+            )
+            self._conn.commit()
+            self.revalidated += 1
+
+    def _evict(self):
+        # LRU: remove os menos acessados até 90% do limite
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        )
+
+        doomed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def iter_bodies(self, endpoint_prefix: str) -> Iterator[Tuple[str, Any]]:
+        """
+        (endpoint, corpo) de todas as respostas cujo endpoint começa com o prefixo.
+        """
+        # conexão própria: o cursor fica aberto durante a iteração (WAL permite)
+        conn = sqlite3.connect(self.path)
+        try:
+            rows = conn.execute(
+                "SELECT endpoint, body FROM responses WHERE endpoint LIKE ? || '%'",
+                (endpoint_prefix,),
+            )
+            for endpoint, blob in rows:
+                yield endpoint, json.loads(zlib.decompress(blob))
+        finally:
+            conn.close()
+
+    # ======================================================
+    # STATS / LIFECYCLE
+    # ======================================================
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+            "bytes": self._total_bytes,
+        }
+
+    def log_stats(self):
+        s = self.stats()
+        log(
+            f"hits={s['hits']} misses={s['misses']} revalidados={s['revalidated']} "
+            f"gravados={s['stores']} evictions={s['evictions']} "
+            f"hit_rate={s['hit_rate']:.1%} tamanho={s['bytes'] / 1024 / 1024:.1f}MB"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# ==========================================================
+# DEFAULT (COMPARTILHADO NO PROCESSO)
+# ==========================================================
+
+_default_cache: Optional[HTTPCache] = None
+_default_lock = threading.Lock()
+
+def get_default_cache() -> Optional[HTTPCache]:
+    global _default_cache
+
+    if not CACHE_ENABLED:
+        return None
+
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache()
+        return _default_cache
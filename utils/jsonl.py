@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+READ_CHUNK_SIZE = 1 << 16
+
+# ==========================================================
+# PATHS
+# ==========================================================
+
+def resolve(path: str) -> str:
+    """
+    Caminho existente para leitura: aceita o irmão .json/.jsonl
+    (arquivos gerados antes da troca de formato).
+    """
+    if os.path.exists(path):
+        return path
+
+    base, ext = os.path.splitext(path)
+    alt = base + (".json" if ext == ".jsonl" else ".jsonl")
+    return alt if os.path.exists(alt) else path
+
+def exists(path: str) -> bool:
+    return os.path.exists(resolve(path))
+
+# ==========================================================
+# READERS
+# ==========================================================
+
+def _iter_json_array(f) -> Iterator[Any]:
+    """
+    Lê um array JSON item a item, sem carregar o arquivo inteiro.
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(READ_CHUNK_SIZE).lstrip()
+
+    if not buf.startswith("["):
+        raise ValueError("Array JSON esperado")
+    buf = buf[1:]
+
+    while True:
+        buf = buf.lstrip()
+        while not buf:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("Array JSON truncado")
+            buf = chunk.lstrip()
+
+        if buf[0] == "]":
+            return
+        if buf[0] == ",":
+            buf = buf[1:]
+            continue
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf)
+                break
+            except json.JSONDecodeError:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    raise
+                buf += chunk
+
+        yield item
+        buf = buf[end:]
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Registros de um arquivo JSONL ou array JSON (detectado pelo conteúdo).
+    """
+    path = resolve(path)
+
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+
+        if head == "[":
+            yield from _iter_json_array(f)
+            return
+
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def read_with_offsets(path: str) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+    """
+    (offset em bytes, registro) para JSONL, permitindo reler um registro
+    depois com read_at sem manter o arquivo em memória.
+    Arrays JSON não têm offset por registro: (None, registro).
+    """
+    path = resolve(path)
+
+    if not path.endswith(".jsonl"):
+        for record in read_records(path):
+            yield None, record
+        return
+
+    with open(path, "rb") as f:
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                return
+            if line.strip():
+                yield offset, json.loads(line)
+
+def read_at(path: str, offset: int) -> Dict[str, Any]:
+    with open(resolve(path), "rb") as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+# ==========================================================
+# WRITERS
+# ==========================================================
+
+class _AtomicWriter:
+    """
+    Escreve em <path>.tmp e renomeia no close: leitores nunca veem
+    um arquivo pela metade e o arquivo anterior fica legível até o fim.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._tmp = f"{path}.tmp"
+        self._file = open(self._tmp, "w", encoding="utf-8")
+
+    def write(self, record: Any):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        if self._file is None:
+            return
+
+        self._finish()
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._file = None
+        os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+
+
+class JsonlWriter(_AtomicWriter):
+    def write(self, record: Any):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+
+
+class JsonArrayWriter(_AtomicWriter):
+    """
+    Array JSON em streaming; mesma saída de json.dump(lista, indent=indent).
+    indent=None grava minificado (separadores sem espaço).
+    """
+
+    def __init__(self, path: str, indent: Optional[int] = 2):
+        super().__init__(path)
+        self.indent = indent
+        self._pad = " " * indent if indent else ""
+
+    def write(self, record: Any):
+        if self.indent:
+            text = json.dumps(record, ensure_ascii=False, indent=self.indent)
+            text = text.replace("\n", "\n" + self._pad)
+            self._file.write(("[\n" if not self.count else ",\n") + self._pad + text)
+        else:
+            text = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            self._file.write(("[" if not self.count else ",") + text)
+
+        self.count += 1
+
+    def _finish(self):
+        if not self.count:
+            self._file.write("[]")
+        else:
+            self._file.write("\n]" if self.indent else "]")
+
+
+def open_writer(path: str):
+    """
+    JSONL para .jsonl, array JSON (compatível) para o resto.
+    """
+    return JsonlWriter(path) if path.endswith(".jsonl") else JsonArrayWriter(path)
+
+def write_records(path: str, records: Iterable[Dict[str, Any]]) -> int:
+    with open_writer(path) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
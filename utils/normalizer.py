@@ -2,7 +2,8 @@
 
 import re
 import unicodedata
-from typing import Optional, Dict
+from functools import lru_cache
+from typing import Optional, Dict, Iterable, List
 
 # ==========================================================
 # STOPWORDS (NÃO REMOVER FORMATOS)
@@ -21,32 +22,45 @@ STOPWORDS = {
 }
 
 # ==========================================================
-# NORMALIZER
+# PATTERNS / CACHE
 # ==========================================================
 
-class TitleNormalizer:
-    @staticmethod
-    def normalize(title: Optional[str]) -> Optional[str]:
-        if not title or not isinstance(title, str):
-            return None
+# símbolos viram espaço (mantém japonês)
+_SYMBOLS_RE = re.compile(r"[^\w\s\u3040-\u30ff\u4e00-\u9faf]")
+
+NORMALIZE_CACHE_SIZE = 65536
 
-        text = title.lower()
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize(title: str) -> Optional[str]:
+    text = title.lower()
 
-        # remove acentos latinos
+    # remove acentos latinos (ASCII já está decomposto)
+    if not text.isascii():
         text = unicodedata.normalize("NFKD", text)
         text = "".join(c for c in text if not unicodedata.combining(c))
 
-        # remove símbolos (mantém japonês)
-        text = re.sub(r"[^\w\s\u3040-\u30ff\u4e00-\u9faf]", " ", text)
+    text = _SYMBOLS_RE.sub(" ", text)
 
-        # normaliza espaços
-        text = re.sub(r"\s+", " ", text).strip()
+    # split() já normaliza espaços; remove stopwords
+    text = " ".join(w for w in text.split() if w not in STOPWORDS)
 
-        # remove stopwords
-        words = [w for w in text.split() if w not in STOPWORDS]
-        text = " ".join(words)
+    return text or None
 
-        return text or None
+# ==========================================================
+# NORMALIZER
+# ==========================================================
+
+class TitleNormalizer:
+    @staticmethod
+    def normalize(title: Optional[str]) -> Optional[str]:
+        if not title or not isinstance(title, str):
+            return None
+
+        return _normalize(title)
+
+    @staticmethod
+    def normalize_many(titles: Iterable[Optional[str]]) -> List[Optional[str]]:
+        return [TitleNormalizer.normalize(t) for t in titles]
 
     @staticmethod
     def normalize_all(titles: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
@@ -57,4 +71,4 @@ class TitleNormalizer:
             if norm:
                 normalized[key] = norm
 
-        return normalized
\ No newline at end of file
+        return normalized
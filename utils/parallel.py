@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# ==========================================================
+# CHUNKS
+# ==========================================================
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+# ==========================================================
+# ORDERED MAP
+# ==========================================================
+
+def imap_ordered(
+    executor: Executor,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    window: int,
+) -> Iterator[Tuple[T, R]]:
+    """
+    (item, fn(item)) na ordem de entrada, com no máximo `window` tarefas
+    em voo: ao contrário de Executor.map, não consome o iterável inteiro.
+    """
+    pending = deque()
+    window = max(1, window)
+
+    try:
+        for item in items:
+            pending.append((item, executor.submit(fn, item)))
+
+            if len(pending) >= window:
+                head, future = pending.popleft()
+                yield head, future.result()
+
+        while pending:
+            head, future = pending.popleft()
+            yield head, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import time
+from typing import Callable, Optional
+
+
+class Progress:
+    """
+    Progresso agregado: loga a cada `every` itens ou `interval` segundos,
+    com throughput (itens/s) e ETA, em vez de uma linha por item.
+    """
+
+    def __init__(
+        self,
+        total: Optional[int],
+        log: Callable[[str], None],
+        every: int = 250,
+        interval: float = 30.0,
+    ):
+        self.total = total
+        self.log = log
+        self.every = every
+        self.interval = interval
+
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last_log = self.started
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def step(self, n: int = 1):
+        self.done += n
+        now = time.perf_counter()
+
+        if self.done % self.every == 0 or now - self._last_log >= self.interval:
+            self._last_log = now
+            self.log(self._line())
+
+    def _line(self) -> str:
+        rate = self.rate
+
+        if not self.total:
+            return f"{self.done} itens | {rate:.1f}/s"
+
+        eta = (self.total - self.done) / rate if rate > 0 else 0
+        return f"[{self.done}/{self.total}] {rate:.1f}/s | ETA {eta / 60:.1f}min"
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started
+        self.log(f"{self.done} itens em {elapsed:.1f}s ({self.rate:.1f}/s)")
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After em segundos: aceita delta-seconds ("30") e HTTP-date
+    ("Wed, 21 Oct 2015 07:28:00 GMT"). None se ausente ou inválido.
+    """
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+# ==========================================================
+# TOKEN BUCKET
+# ==========================================================
+
+class TokenBucket:
+    """
+    Token bucket thread-safe.
+    A taxa é ajustada em tempo real a partir dos headers de rate limit
+    devolvidos pela API (X-RateLimit-Limit / Remaining / Retry-After).
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 6.0)
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+
+        if now >= self.blocked_until:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def try_acquire(self) -> float:
+        """
+        Tenta consumir um token.
+        Retorna 0.0 se conseguiu, senão quantos segundos aguardar.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if now < self.blocked_until:
+                return self.blocked_until - now
+
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+
+            return (1.0 - self.tokens) / self.rate
+
+    def acquire(self):
+        """
+        Bloqueia até um token estar disponível.
+        """
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        Suspende o bucket (ex: 429 com Retry-After).
+        """
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Sincroniza o bucket com a visão do servidor.
+        """
+        limit = _header_float(headers, "X-RateLimit-Limit")
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+
+        if retry_after is not None:
+            self.pause(retry_after)
+            return
+
+        with self._lock:
+            self._refill(time.monotonic())
+
+            if limit:
+                self.rate = limit / 60.0
+                self.capacity = max(1.0, limit / 6.0)
+
+            # servidor é a fonte da verdade: nunca acima do restante
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
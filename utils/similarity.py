@@ -1,20 +1,106 @@
 # -*- coding: utf-8 -*-
 
 from difflib import SequenceMatcher
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+# pares (a, b) já comparados: os mesmos títulos TMDB voltam em várias buscas
+RATIO_CACHE_SIZE = 65536
+
+# ==========================================================
+# PREPARED TITLE
+# ==========================================================
+
+class PreparedTitle:
+    """
+    Título pré-processado: conjunto de palavras e bitmasks por caractere
+    (usados pelo LCS bit-paralelo). Criado uma vez por string.
+    """
+
+    __slots__ = ("text", "tokens", "masks", "full")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: FrozenSet[str] = frozenset(text.split())
+
+        masks: Dict[str, int] = {}
+        for i, c in enumerate(text):
+            masks[c] = masks.get(c, 0) | (1 << i)
+
+        self.masks = masks
+        self.full = (1 << len(text)) - 1
+
+    def lcs(self, other: str) -> int:
+        """
+        Comprimento da maior subsequência comum (Hyyrö, bit-paralelo):
+        O(len(other)) operações em inteiros de len(self) bits.
+        """
+        v = self.full
+        masks = self.masks
+
+        for c in other:
+            u = v & masks.get(c, 0)
+            v = ((v + u) | (v - u)) & self.full
+
+        return len(self.text) - v.bit_count()
+
+@lru_cache(maxsize=65536)
+def prepare(text: str) -> PreparedTitle:
+    return PreparedTitle(text)
+
+# ==========================================================
+# SIMILARITY
+# ==========================================================
+
+@lru_cache(maxsize=RATIO_CACHE_SIZE)
+def _ratio(a: str, b: str) -> float:
+    # métrica de referência dos limiares (SCORE_THRESHOLD / FAST_MATCH_THRESHOLD)
+    if a == b:
+        return 1.0
+
+    return SequenceMatcher(None, a, b).ratio()
+
+def _indel_ratio(a: PreparedTitle, b: PreparedTitle) -> float:
+    """
+    2·LCS / (len(a) + len(b)): limite superior de SequenceMatcher.ratio
+    (os blocos do difflib formam uma subsequência comum), bem mais barato.
+    """
+    total = len(a.text) + len(b.text)
+    if not total:
+        return 0.0
+
+    return 2.0 * a.lcs(b.text) / total
+
+def _overlap(a: PreparedTitle, b: PreparedTitle) -> float:
+    if not a.tokens or not b.tokens:
+        return 0.0
+
+    return len(a.tokens & b.tokens) / len(a.tokens | b.tokens)
+
+def _combined(a: PreparedTitle, b: PreparedTitle, ratio: float) -> float:
+    # Boost se uma string contém a outra
+    contains_boost = 0.1 if a.text in b.text or b.text in a.text else 0.0
+
+    final_score = (
+        ratio * 0.7 +
+        _overlap(a, b) * 0.3 +
+        contains_boost
+    )
+
+    return min(round(final_score, 3), 1.0)
 
 
 class TitleSimilarity:
     @staticmethod
     def ratio(a: Optional[str], b: Optional[str]) -> float:
         """
-        Similaridade básica entre duas strings.
+        Similaridade básica entre duas strings (SequenceMatcher.ratio).
         Retorna valor entre 0.0 e 1.0
         """
         if not a or not b:
             return 0.0
 
-        return SequenceMatcher(None, a, b).ratio()
+        return _ratio(a, b)
 
     @staticmethod
     def word_overlap(a: Optional[str], b: Optional[str]) -> float:
@@ -24,16 +110,7 @@ class TitleSimilarity:
         if not a or not b:
             return 0.0
 
-        set_a = set(a.split())
-        set_b = set(b.split())
-
-        if not set_a or not set_b:
-            return 0.0
-
-        intersection = set_a & set_b
-        union = set_a | set_b
-
-        return len(intersection) / len(union)
+        return _overlap(prepare(a), prepare(b))
 
     @staticmethod
     def score(a: Optional[str], b: Optional[str]) -> float:
@@ -43,18 +120,27 @@ class TitleSimilarity:
         if not a or not b:
             return 0.0
 
-        ratio_score = TitleSimilarity.ratio(a, b)
-        overlap_score = TitleSimilarity.word_overlap(a, b)
+        return _combined(prepare(a), prepare(b), _ratio(a, b))
 
-        # Boost se uma string contém a outra
-        contains_boost = 0.0
-        if a in b or b in a:
-            contains_boost = 0.1
+    @staticmethod
+    def score_upper_bound(a: Optional[str], b: Optional[str]) -> float:
+        """
+        Limite superior de score(a, b) via LCS bit-paralelo, sem difflib:
+        serve para descartar candidatos que não podem vencer.
+        """
+        if not a or not b:
+            return 0.0
 
-        final_score = (
-            ratio_score * 0.7 +
-            overlap_score * 0.3 +
-            contains_boost
-        )
+        pa, pb = prepare(a), prepare(b)
+        return _combined(pa, pb, _indel_ratio(pa, pb))
+
+    @staticmethod
+    def score_many(query: Optional[str], candidates: Iterable[Optional[str]]) -> List[float]:
+        """
+        Score de uma query contra vários candidatos; a query é preparada uma vez.
+        """
+        if not query:
+            return [0.0 for _ in candidates]
 
-        return min(round(final_score, 3), 1.0)
\ No newline at end of file
+        q = prepare(query)
+        return [_combined(q, prepare(c), _ratio(query, c)) if c else 0.0 for c in candidates]
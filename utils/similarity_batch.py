@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência só das ferramentas offline
+    np = None
+
+from utils.similarity import TitleSimilarity
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+NGRAM = 3
+
+# larguras fixas dos vetores (hashing trick); colisões só afetam o ranking
+NGRAM_DIM = 512
+WORD_DIM = 256
+
+# linhas de query por bloco: memória ≈ CHUNK_SIZE × len(targets) × 4 bytes
+CHUNK_SIZE = 256
+
+# ==========================================================
+# ENCODING
+# ==========================================================
+
+def _bucket(token: str, dim: int) -> int:
+    return zlib.crc32(token.encode("utf-8")) % dim
+
+def encode_titles(titles: Sequence[Optional[str]], ngram_dim: int = NGRAM_DIM, word_dim: int = WORD_DIM):
+    """
+    (contagem de n-grams normalizada L2, incidência binária de palavras, nº de palavras).
+    """
+    grams = np.zeros((len(titles), ngram_dim), dtype=np.float32)
+    words = np.zeros((len(titles), word_dim), dtype=np.float32)
+
+    for row, title in enumerate(titles):
+        if not title:
+            continue
+
+        padded = f" {title} "
+        for i in range(max(1, len(padded) - NGRAM + 1)):
+            grams[row, _bucket(padded[i:i + NGRAM], ngram_dim)] += 1.0
+
+        for word in set(title.split()):
+            words[row, _bucket(word, word_dim)] = 1.0
+
+    norms = np.linalg.norm(grams, axis=1, keepdims=True)
+    np.divide(grams, norms, out=grams, where=norms > 0)
+
+    return grams, words, words.sum(axis=1)
+
+# ==========================================================
+# BATCH SCORER
+# ==========================================================
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("numpy é necessário para BatchTitleScorer (pip install numpy)")
+
+class BatchTitleScorer:
+    """
+    Score em lote de muitos títulos contra muitos títulos alvo.
+    Mesma combinação do TitleSimilarity (0.7·n-gram + 0.3·Jaccard de palavras),
+    com o termo de caractere aproximado por cosseno de trigramas.
+    Processa as queries em blocos para limitar a memória e devolve top-k.
+    """
+
+    def __init__(
+        self,
+        targets: Sequence[Optional[str]],
+        ngram_dim: int = NGRAM_DIM,
+        word_dim: int = WORD_DIM,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        require_numpy()
+
+        self.targets = list(targets)
+        self.ngram_dim = ngram_dim
+        self.word_dim = word_dim
+        self.chunk_size = chunk_size
+
+        self._grams, self._words, self._sizes = encode_titles(self.targets, ngram_dim, word_dim)
+        self._words_t = np.ascontiguousarray(self._words.T)
+        self._grams_t = np.ascontiguousarray(self._grams.T)
+
+    def _chunk_scores(self, queries: Sequence[Optional[str]]):
+        q_grams, q_words, q_sizes = encode_titles(queries, self.ngram_dim, self.word_dim)
+
+        scores = q_grams @ self._grams_t
+        scores *= 0.7
+
+        # Jaccard = |A∩B| / (|A| + |B| - |A∩B|), calculado em blocos in-place
+        inter = q_words @ self._words_t
+        union = q_sizes[:, None] + self._sizes[None, :]
+        union -= inter
+        np.divide(inter, union, out=inter, where=union > 0)
+        inter *= 0.3
+
+        scores += inter
+        return scores
+
+    def top_k(
+        self,
+        queries: Sequence[Optional[str]],
+        k: int = 5,
+        rescore: bool = True,
+        oversample: int = 4,
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Para cada query: [(índice do alvo, score)] em ordem decrescente.
+        rescore=True recalcula k·oversample finalistas com TitleSimilarity.score
+        (exato) e mantém os k melhores.
+        """
+        k = min(k, len(self.targets))
+        pool = min(k * oversample if rescore else k, len(self.targets))
+        results: List[List[Tuple[int, float]]] = []
+
+        if not k:
+            return [[] for _ in queries]
+
+        for start in range(0, len(queries), self.chunk_size):
+            chunk = queries[start:start + self.chunk_size]
+            scores = self._chunk_scores(chunk)
+
+            top = np.argpartition(-scores, pool - 1, axis=1)[:, :pool]
+
+            for row, query in enumerate(chunk):
+                idxs = top[row]
+
+                if rescore:
+                    exact = TitleSimilarity.score_many(query, [self.targets[i] for i in idxs])
+                    ranked = sorted(zip(idxs.tolist(), exact), key=lambda x: x[1], reverse=True)[:k]
+                else:
+                    approx = scores[row, idxs]
+                    order = np.argsort(-approx)
+                    ranked = [(int(idxs[o]), round(float(approx[o]), 3)) for o in order]
+
+                results.append(ranked)
+
+        return results
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from utils.normalizer import TitleNormalizer
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+# linhas acumuladas por executemany
+BATCH_SIZE = 2000
+
+TMDB_COLUMNS = (
+    "title", "original_title", "overview", "status", "release_date",
+    "episodes", "seasons", "runtime", "vote_average", "vote_count",
+    "popularity", "poster", "backdrop",
+)
+
+SCHEMA = """
+CREATE TABLE anime (
+    anilist_id      INTEGER PRIMARY KEY,
+    romaji          TEXT,
+    english         TEXT,
+    native          TEXT,
+    format          TEXT,
+    status          TEXT,
+    episodes        INTEGER,
+    year            INTEGER,
+    anilist_score   REAL,
+    popularity      INTEGER,
+    tmdb_media_type TEXT,
+    tmdb_id         INTEGER,
+    match_method    TEXT,
+    match_score     REAL,
+    data            TEXT NOT NULL
+);
+
+CREATE TABLE titles (
+    anilist_id INTEGER NOT NULL,
+    kind       TEXT NOT NULL,
+    title      TEXT NOT NULL,
+    normalized TEXT
+);
+
+CREATE TABLE genres (
+    anilist_id INTEGER NOT NULL,
+    source     TEXT NOT NULL,
+    genre      TEXT NOT NULL,
+    popularity INTEGER
+);
+
+CREATE TABLE tmdb (
+    media_type     TEXT NOT NULL,
+    id             INTEGER NOT NULL,
+    title          TEXT,
+    original_title TEXT,
+    overview       TEXT,
+    status         TEXT,
+    release_date   TEXT,
+    episodes       INTEGER,
+    seasons        INTEGER,
+    runtime        INTEGER,
+    vote_average   REAL,
+    vote_count     INTEGER,
+    popularity     REAL,
+    poster         TEXT,
+    backdrop       TEXT,
+    PRIMARY KEY (media_type, id)
+) WITHOUT ROWID;
+
+CREATE TABLE trailers (
+    media_type TEXT NOT NULL,
+    tmdb_id    INTEGER NOT NULL,
+    key        TEXT NOT NULL,
+    name       TEXT,
+    language   TEXT,
+    official   INTEGER
+);
+
+CREATE TABLE ratings (
+    media_type TEXT NOT NULL,
+    tmdb_id    INTEGER NOT NULL,
+    country    TEXT NOT NULL,
+    rating     TEXT
+);
+
+CREATE VIRTUAL TABLE titles_fts USING fts5(
+    title,
+    anilist_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TABLE meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# criados depois da carga: inserir sem índice e indexar no fim é bem mais rápido
+INDEXES = """
+CREATE INDEX idx_anime_tmdb ON anime (tmdb_media_type, tmdb_id);
+CREATE INDEX idx_anime_year ON anime (year, popularity DESC);
+CREATE INDEX idx_titles_normalized ON titles (normalized);
+CREATE INDEX idx_titles_anime ON titles (anilist_id);
+CREATE INDEX idx_genres_genre ON genres (source, genre, popularity DESC);
+CREATE INDEX idx_genres_anime ON genres (anilist_id);
+CREATE INDEX idx_trailers_tmdb ON trailers (media_type, tmdb_id);
+CREATE INDEX idx_ratings_tmdb ON ratings (media_type, tmdb_id);
+"""
+
+# ==========================================================
+# WRITER
+# ==========================================================
+
+class SQLiteExporter:
+    """
+    Banco SQLite normalizado para consultas pontuais (ID AniList/TMDB,
+    gênero, ano, prefixo de título, busca textual via FTS5).
+    Carga em uma única transação em <path>.tmp, renomeado no close.
+    """
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._tmp = f"{path}.tmp"
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+        # isolation_level=None: transação controlada à mão (um único BEGIN)
+        self._conn = sqlite3.connect(self._tmp, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute("BEGIN")
+
+        self._rows: Dict[str, List[tuple]] = {
+            "anime": [], "titles": [], "titles_fts": [], "genres": [],
+            "tmdb": [], "trailers": [], "ratings": [],
+        }
+        self._seen_tmdb = set()
+
+    # ======================================================
+    # ROWS
+    # ======================================================
+
+    def write(self, anime: Dict[str, Any]):
+        anilist_id = anime["anilist_id"]
+        titles = anime.get("titles") or {}
+        match = anime.get("match") or {}
+        tmdb = anime.get("tmdb") or {}
+        rows = self._rows
+
+        rows["anime"].append((
+            anilist_id,
+            titles.get("romaji"),
+            titles.get("english"),
+            titles.get("native"),
+            anime.get("format"),
+            anime.get("status"),
+            anime.get("episodes"),
+            anime.get("year"),
+            anime.get("anilist_score"),
+            anime.get("popularity"),
+            tmdb.get("media_type"),
+            tmdb.get("id"),
+            match.get("method"),
+            match.get("score"),
+            json.dumps(anime, ensure_ascii=False, separators=(",", ":")),
+        ))
+
+        variants = [(kind, titles.get(kind)) for kind in ("romaji", "english", "native")]
+        variants.append(("tmdb", tmdb.get("title")))
+        variants.append(("tmdb_original", tmdb.get("original_title")))
+        variants.append(("tmdb_localized", (anime.get("tmdb_localized") or {}).get("title")))
+
+        seen = set()
+        for kind, title in variants:
+            if not title or title in seen:
+                continue
+            seen.add(title)
+            # normalized é NULL para títulos só de stopwords ("The Movie"):
+            # ficam fora do prefixo, mas continuam na busca FTS pelo título cru
+            rows["titles"].append((anilist_id, kind, title, TitleNormalizer.normalize(title)))
+            rows["titles_fts"].append((title, anilist_id))
+
+        # popularidade duplicada aqui: "top N do gênero" sai direto do índice
+        popularity = anime.get("popularity")
+        for genre in anime.get("genres") or []:
+            rows["genres"].append((anilist_id, "anilist", genre, popularity))
+        for genre in tmdb.get("genres") or []:
+            rows["genres"].append((anilist_id, "tmdb", genre, popularity))
+
+        if tmdb.get("id"):
+            self._add_tmdb(tmdb)
+
+        self.count += 1
+        if len(rows["anime"]) >= self.batch_size:
+            self._flush()
+
+    def _add_tmdb(self, tmdb: Dict[str, Any]):
+        # várias temporadas apontam para a mesma obra: uma linha por obra
+        key = (tmdb["media_type"], tmdb["id"])
+        if key in self._seen_tmdb:
+            return
+        self._seen_tmdb.add(key)
+
+        self._rows["tmdb"].append(key + tuple(tmdb.get(c) for c in TMDB_COLUMNS))
+
+        for t in tmdb.get("trailers") or []:
+            if t.get("key"):
+                official = None if t.get("official") is None else int(t["official"])
+                self._rows["trailers"].append(key + (t["key"], t.get("name"), t.get("language"), official))
+
+        for country, rating in (tmdb.get("content_ratings") or {}).items():
+            self._rows["ratings"].append(key + (country, rating))
+
+    def _flush(self):
+        for table, rows in self._rows.items():
+            if not rows:
+                continue
+            marks = ",".join("?" * len(rows[0]))
+            self._conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+            rows.clear()
+
+    # ======================================================
+    # FINISH
+    # ======================================================
+
+    def close(self):
+        if self._conn is None:
+            return
+
+        self._flush()
+
+        # executescript faria COMMIT antes: índices entram na mesma transação
+        for statement in INDEXES.split(";"):
+            if statement.strip():
+                self._conn.execute(statement)
+
+        self._conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("count", str(self.count)), ("tmdb_count", str(len(self._seen_tmdb)))],
+        )
+        self._conn.execute("INSERT INTO titles_fts (titles_fts) VALUES ('optimize')")
+        self._conn.execute("COMMIT")
+        self._conn.execute("ANALYZE")
+        self._conn.close()
+        self._conn = None
+
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        if self._conn is None:
+            return
+
+        self._conn.close()
+        self._conn = None
+        os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+
+# ==========================================================
+# READER
+# ==========================================================
+
+class AnimeDB:
+    """
+    Consultas sobre o banco gerado por SQLiteExporter; devolvem os
+    registros no mesmo formato de animes_enriched.json.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _records(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in self._conn.execute(sql, params)]
+
+    def by_anilist_id(self, anilist_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._records("SELECT data FROM anime WHERE anilist_id = ?", (anilist_id,))
+        return rows[0] if rows else None
+
+    def by_tmdb_id(self, tmdb_id: int, media_type: str) -> List[Dict[str, Any]]:
+        return self._records(
+            "SELECT data FROM anime WHERE tmdb_media_type = ? AND tmdb_id = ? ORDER BY year",
+            (media_type, tmdb_id),
+        )
+
+    def by_genre(self, genre: str, limit: int = 50, source: str = "anilist") -> List[Dict[str, Any]]:
+        """
+        source: "anilist" (gêneros AniList) ou "tmdb".
+        """
+        return self._records(
+            "SELECT a.data FROM genres g JOIN anime a ON a.anilist_id = g.anilist_id "
+            "WHERE g.source = ? AND g.genre = ? ORDER BY g.popularity DESC LIMIT ?",
+            (source, genre, limit),
+        )
+
+    def by_year(self, year: int, limit: int = 50) -> List[Dict[str, Any]]:
+        return self._records(
+            "SELECT data FROM anime WHERE year = ? ORDER BY popularity DESC LIMIT ?",
+            (year, limit),
+        )
+
+    def title_prefix(self, prefix: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Prefixo sobre o título normalizado (mesma normalização do matching).
+        """
+        norm = TitleNormalizer.normalize(prefix)
+        if not norm:
+            return []
+
+        return self._records(
+            "SELECT data FROM anime WHERE anilist_id IN "
+            "(SELECT anilist_id FROM titles WHERE normalized >= ? AND normalized < ?) "
+            "ORDER BY popularity DESC LIMIT ?",
+            (norm, norm + "\U0010ffff", limit),
+        )
+
+    def search(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Busca textual (FTS5, sem acentos) em todas as variantes de título;
+        o último termo vale como prefixo.
+        """
+        terms = [t.replace('"', "") for t in text.split()]
+        terms = [t for t in terms if t]
+        if not terms:
+            return []
+
+        query = " ".join(f'"{t}"' for t in terms) + "*"
+
+        return self._records(
+            "SELECT a.data FROM anime a JOIN ("
+            "  SELECT anilist_id, min(rank) AS r FROM titles_fts "
+            "  WHERE titles_fts MATCH ? GROUP BY anilist_id"
+            ") f ON f.anilist_id = a.anilist_id ORDER BY f.r LIMIT ?",
+            (query, limit),
+        )
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -4,19 +4,91 @@ import os
 import time
 import requests
 import itertools
-from typing import Optional, Dict, Any, List
+import threading
+from collections import deque
+from datetime import date, timedelta
+from typing import Optional, Dict, Any, List, Set
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.coalesce import RequestCoalescer
+from utils.http_cache import HTTPCache, get_default_cache
 
 TMDB_API_BASE = "https://api.themoviedb.org/3"
 TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p/"
 
+# 1 requisição com append de translations em vez de 3 (en/pt/ja)
+ENRICH_WITH_TRANSLATIONS = True
+
+ENRICH_APPEND = "videos,credits,content_ratings,release_dates,keywords"
+
+# (idioma, país) de cada bloco derivado das translations
+LOCALIZED_LANGUAGE = ("pt", "BR")
+FALLBACK_LANGUAGE = ("ja", "JP")
+
+# buscas idênticas na mesma execução (franquias, variantes de título iguais)
+# compartilham a requisição em voo e ficam num LRU deste tamanho
+SEARCH_MEMO_SIZE = 4096
+
 def log(msg: str, level: str = "INFO"):
     print(f"[TMDB][{level}] {msg}")
 
+# ==========================================================
+# LATENCY STATS
+# ==========================================================
+
+class LatencyStats:
+    """
+    Latência por requisição de rede (cache hits não entram).
+    Mantém as últimas `window` amostras para percentis.
+    """
+
+    def __init__(self, window: int = 10000):
+        self.count = 0
+        self.total = 0.0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self._samples.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            samples = sorted(self._samples)
+
+        if not samples:
+            return {"count": 0}
+
+        def pct(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(samples[-1] * 1000, 1),
+        }
+
 
 class TMDBClient:
-    def __init__(self, timeout: int = 15, retries: int = 3):
+    def __init__(
+        self,
+        timeout: int = 15,
+        retries: int = 3,
+        cache: Optional[HTTPCache] = None,
+        pool_size: int = 10,
+    ):
         self.timeout = timeout
         self.retries = retries
+        self.cache = cache or get_default_cache()
+        self.latency = LatencyStats()
+        self.searches = RequestCoalescer(SEARCH_MEMO_SIZE)
+        self._thread = threading.local()
 
         tokens = [
             os.getenv("TMDB_TOKEN_1"),
@@ -30,29 +102,151 @@ class TMDBClient:
         if not self.tokens:
             raise RuntimeError("Nenhum TMDB_TOKEN configurado")
 
-        self._token_cycle = itertools.cycle(self.tokens)
+        # uma sessão (pool keep-alive) por token
+        self.sessions = [self._build_session(t, pool_size) for t in self.tokens]
+        self._session_cycle = itertools.cycle(self.sessions)
         log(f"{len(self.tokens)} tokens TMDB carregados")
 
     # ======================================================
-    # REQUEST
+    # SESSIONS / LIFECYCLE
     # ======================================================
 
-    def _headers(self) -> Dict[str, str]:
+    @staticmethod
+    def _headers(token: str) -> Dict[str, str]:
         return {
-            "Authorization": f"Bearer {next(self._token_cycle)}",
+            "Authorization": f"Bearer {token}",
             "Accept": "application/json",
             "User-Agent": "anime-db-bot/1.0",
         }
 
-    def _request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
-        url = f"{TMDB_API_BASE}{endpoint}"
+    def _build_session(self, token: str, pool_size: int) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(self._headers(token))
+
+        # retry de transporte (conexão / 5xx); 429 é tratado em _request
+        retry = Retry(
+            total=2,
+            connect=2,
+            read=2,
+            status=2,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("https://", adapter)
+
+        return session
+
+    def close(self):
+        for session in self.sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def log_stats(self):
+        c = self.searches.stats()
+        if c["calls"]:
+            log(
+                f"Buscas: {c['calls']} | executadas: {c['executed']} | "
+                f"economizadas: {c['saved']} (memo {c['memo_hits']}, em voo {c['joined']})"
+            )
+
+        s = self.latency.summary()
+        if not s["count"]:
+            log("Nenhuma requisição de rede")
+            return
+        log(
+            f"Requisições: {s['count']} | média {s['avg_ms']}ms | "
+            f"p50 {s['p50_ms']}ms | p95 {s['p95_ms']}ms | max {s['max_ms']}ms"
+        )
+
+    # ======================================================
+    # REQUEST
+    # ======================================================
+
+    def sent_in_thread(self) -> int:
+        """
+        Requisições de rede feitas pela thread atual. Respostas do cache,
+        do memo de buscas ou de uma busca em voo de outra thread não contam:
+        quem faz throttle só precisa esperar depois de ir de fato à rede.
+        """
+        return getattr(self._thread, "sent", 0)
+
+    def _cache_lookup(self, endpoint: str, params: Optional[Dict[str, Any]]):
+        if not self.cache:
+            return None, None
+
+        key = self.cache.key(endpoint, params)
+        return key, self.cache.get(key)
+
+    def _send(
+        self,
+        session: requests.Session,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        cached=None,
+    ) -> requests.Response:
+        headers = cached.conditional_headers() if cached else None
+
+        started = time.perf_counter()
+        r = session.get(
+            f"{TMDB_API_BASE}{endpoint}",
+            headers=headers,
+            params=params,
+            timeout=self.timeout,
+        )
+        self.latency.add(time.perf_counter() - started)
+        self._thread.sent = self.sent_in_thread() + 1
+
+        return r
+
+    def _accept(self, r: requests.Response, endpoint: str, key, cached) -> Optional[Dict]:
+        """
+        Trata 200/304 (grava/renova o cache). None = sem corpo utilizável.
+        """
+        if r.status_code == 304 and cached:
+            self.cache.refresh(key, endpoint)
+            return cached.body
+
+        if r.status_code == 200:
+            data = r.json()
+            if self.cache:
+                self.cache.set(
+                    key,
+                    endpoint,
+                    data,
+                    etag=r.headers.get("ETag"),
+                    last_modified=r.headers.get("Last-Modified"),
+                )
+            return data
+
+        return None
+
+    def _request(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        refresh: bool = False,
+    ) -> Optional[Dict]:
+        key, cached = self._cache_lookup(endpoint, params)
+
+        # refresh: ignora a validade e revalida (ETag) com o TMDB
+        if cached and cached.fresh and not refresh:
+            return cached.body
 
         for attempt in range(1, self.retries + 1):
             try:
-                r = requests.get(url, headers=self._headers(), params=params, timeout=self.timeout)
+                r = self._send(next(self._session_cycle), endpoint, params, cached)
 
-                if r.status_code == 200:
-                    return r.json()
+                data = self._accept(r, endpoint, key, cached)
+                if data is not None:
+                    return data
 
                 if r.status_code == 429:
                     wait = min(2 * attempt, 10)
@@ -73,45 +267,193 @@ class TMDBClient:
     # SEARCH
     # ======================================================
 
+    @staticmethod
+    def _search_key(endpoint: str, params: Dict[str, Any]) -> tuple:
+        return (endpoint,) + tuple(sorted(params.items()))
+
+    def _search(self, endpoint: str, params: Dict[str, Any]) -> List[Dict]:
+        key = self._search_key(endpoint, params)
+        data = self.searches.call(key, lambda: self._request(endpoint, params))
+        return data.get("results", []) if data else []
+
     def search_multi(self, query: str, language: str = "en-US") -> List[Dict]:
-        data = self._request("/search/multi", {
+        return self._search("/search/multi", {
             "query": query,
             "include_adult": False,
             "language": language,
         })
-        return data.get("results", []) if data else []
+
+    @staticmethod
+    def _typed(results: List[Dict], media_type: str) -> List[Dict]:
+        # /search/tv e /search/movie não trazem media_type (o /search/multi traz)
+        return [dict(r, media_type=media_type) for r in results]
+
+    @staticmethod
+    def _typed_params(query: str, language: str, year_param: str, year: Optional[int]) -> Dict[str, Any]:
+        params = {"query": query, "include_adult": False, "language": language}
+        if year:
+            params[year_param] = year
+        return params
+
+    def search_tv(self, query: str, year: Optional[int] = None, language: str = "en-US") -> List[Dict]:
+        params = self._typed_params(query, language, "first_air_date_year", year)
+        return self._typed(self._search("/search/tv", params), "tv")
+
+    def search_movie(self, query: str, year: Optional[int] = None, language: str = "en-US") -> List[Dict]:
+        params = self._typed_params(query, language, "year", year)
+        return self._typed(self._search("/search/movie", params), "movie")
+
+    # ======================================================
+    # CHANGES
+    # ======================================================
+
+    def changes(self, media_type: str, start: date, end: Optional[date] = None) -> Optional[Set[int]]:
+        """
+        IDs alterados no TMDB entre start e end (janelas de 14 dias, limite da API).
+        None = feed indisponível; o chamador deve tratar tudo como alterado.
+        """
+        end = end or date.today()
+        ids: Set[int] = set()
+
+        window_start = start
+        while window_start <= end:
+            window_end = min(window_start + timedelta(days=14), end)
+            page = 1
+
+            while True:
+                data = self._request(f"/{media_type}/changes", {
+                    "start_date": window_start.isoformat(),
+                    "end_date": window_end.isoformat(),
+                    "page": page,
+                })
+                if data is None:
+                    return None
+
+                ids.update(r["id"] for r in data.get("results", []) if r.get("id"))
+
+                if page >= (data.get("total_pages") or 1):
+                    break
+                page += 1
+
+            window_start = window_end + timedelta(days=1)
+
+        return ids
 
     # ======================================================
     # ENRICH
     # ======================================================
 
-    def enrich(self, tmdb_id: int, media_type: str) -> Optional[Dict[str, Any]]:
+    def enrich(self, tmdb_id: int, media_type: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        if ENRICH_WITH_TRANSLATIONS:
+            base = self._request(f"/{media_type}/{tmdb_id}", self._translated_params(), refresh)
+            return self._build_from_translations(base, media_type)
+
         params = {
-            "append_to_response": "videos,credits,content_ratings,release_dates,keywords",
+            "append_to_response": ENRICH_APPEND,
             "language": "en-US",
         }
 
-        base = self._request(f"/{media_type}/{tmdb_id}", params)
+        base = self._request(f"/{media_type}/{tmdb_id}", params, refresh)
         if not base:
             return None
 
         return {
             "tmdb": self._normalize(base, media_type),
             "tmdb_localized": self._normalize(
-                self._request(f"/{media_type}/{tmdb_id}", {**params, "language": "pt-BR"}),
+                self._request(f"/{media_type}/{tmdb_id}", {**params, "language": "pt-BR"}, refresh),
                 media_type
             ),
             "tmdb_fallback": self._normalize(
-                self._request(f"/{media_type}/{tmdb_id}", {**params, "language": "ja-JP"}),
+                self._request(f"/{media_type}/{tmdb_id}", {**params, "language": "ja-JP"}, refresh),
                 media_type
             ),
         }
 
+    @staticmethod
+    def _translated_params() -> Dict[str, Any]:
+        languages = ["en", LOCALIZED_LANGUAGE[0], FALLBACK_LANGUAGE[0]]
+        return {
+            "append_to_response": f"{ENRICH_APPEND},translations,images",
+            "language": "en-US",
+            # vídeos e pôsteres/backdrops dos três idiomas numa resposta só
+            "include_video_language": ",".join(languages + ["null"]),
+            "include_image_language": ",".join(languages),
+        }
+
+    def _build_from_translations(self, base: Optional[Dict], media_type: str) -> Optional[Dict[str, Any]]:
+        if not base:
+            return None
+
+        return {
+            "tmdb": self._normalize(base, media_type, video_language="en"),
+            "tmdb_localized": self._localize(base, media_type, *LOCALIZED_LANGUAGE),
+            "tmdb_fallback": self._localize(base, media_type, *FALLBACK_LANGUAGE),
+        }
+
+    def _localize(self, base: Dict, media_type: str, language: str, country: str) -> Dict:
+        """
+        Bloco localizado a partir da resposta en-US, campo a campo:
+        - title / overview: bloco translations. Sem tradução segue o TMDB:
+          título original e overview vazio;
+        - poster / backdrop: imagem do idioma mais bem votada (images), como
+          o TMDB escolhe com language=; sem imagem no idioma, a do en-US;
+        - trailers: vídeos do idioma (include_video_language);
+        - genres: continuam em inglês (translations não traz gêneros);
+        - studios / networks / content_ratings e numéricos não dependem
+          do idioma.
+        """
+        localized = self._normalize(base, media_type, video_language=language)
+
+        images = base.get("images") or {}
+        poster = self._pick_image(images, "posters", language)
+        if poster:
+            localized["poster"] = self.image_url(poster)
+        backdrop = self._pick_image(images, "backdrops", language)
+        if backdrop:
+            localized["backdrop"] = self.image_url(backdrop, "w780")
+
+        translation = self._find_translation(base, language, country)
+        data = (translation or {}).get("data") or {}
+
+        localized["title"] = (
+            data.get("title")
+            or data.get("name")
+            or localized["original_title"]
+        )
+        localized["overview"] = data.get("overview") or ""
+
+        return localized
+
+    @staticmethod
+    def _pick_image(images: Dict, kind: str, language: str) -> Optional[str]:
+        candidates = [i for i in images.get(kind) or [] if i.get("iso_639_1") == language]
+        if not candidates:
+            return None
+
+        best = max(candidates, key=lambda i: (i.get("vote_average") or 0, i.get("vote_count") or 0))
+        return best.get("file_path")
+
+    @staticmethod
+    def _find_translation(base: Dict, language: str, country: str) -> Optional[Dict]:
+        translations = (base.get("translations") or {}).get("translations") or []
+
+        same_language = [t for t in translations if t.get("iso_639_1") == language]
+        for t in same_language:
+            if t.get("iso_3166_1") == country:
+                return t
+
+        return same_language[0] if same_language else None
+
     # ======================================================
     # NORMALIZE
     # ======================================================
 
-    def _normalize(self, data: Optional[Dict], media_type: str) -> Optional[Dict]:
+    def _normalize(
+        self,
+        data: Optional[Dict],
+        media_type: str,
+        video_language: Optional[str] = None,
+    ) -> Optional[Dict]:
         if not data:
             return None
 
@@ -150,7 +492,7 @@ class TMDBClient:
 
             "origin_country": data.get("origin_country"),
 
-            "trailers": self._extract_trailers(data.get("videos", {})),
+            "trailers": self._extract_trailers(data.get("videos", {}), video_language),
             "content_ratings": self._extract_ratings(data, media_type),
         }
 
@@ -158,7 +500,7 @@ class TMDBClient:
     # EXTRAS
     # ======================================================
 
-    def _extract_trailers(self, videos: Dict) -> List[Dict]:
+    def _extract_trailers(self, videos: Dict, language: Optional[str] = None) -> List[Dict]:
         return [
             {
                 "name": v.get("name"),
@@ -168,6 +510,7 @@ class TMDBClient:
             }
             for v in videos.get("results", [])
             if v.get("site") == "YouTube" and v.get("type") == "Trailer"
+            and (language is None or v.get("iso_639_1") == language)
         ]
 
     def _extract_ratings(self, data: Dict, media_type: str) -> Dict[str, str]:
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.normalizer import TitleNormalizer
+from utils.similarity import TitleSimilarity
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# v2: só títulos de animação / origem japonesa (v1 indexava o export inteiro)
+INDEX_FILE = os.path.join(ROOT_DIR, "data", "cache", "tmdb_title_index.v2.json.gz")
+
+NGRAM = 3
+
+# n-grams presentes em mais que isso das entradas não discriminam
+MAX_POSTING_RATIO = 0.05
+
+# candidatos por contagem de n-grams antes do rescore fino
+PREFILTER_LIMIT = 50
+
+ANIMATION_GENRE_ID = 16
+
+# hiragana / katakana: título original japonês (kanji sozinho pode ser chinês)
+KANA_RE = re.compile(r"[\u3040-\u30ff]")
+
+# ==========================================================
+# LOG
+# ==========================================================
+
+def log(msg: str, level: str = "INFO"):
+    print(f"[INDEX][{level}] {msg}")
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def ngrams(text: str, n: int = NGRAM) -> set:
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+def _year(date_str: Optional[str]) -> Optional[int]:
+    if date_str and len(date_str) >= 4 and date_str[:4].isdigit():
+        return int(date_str[:4])
+    return None
+
+def is_anime_like(result: Dict[str, Any]) -> bool:
+    """
+    Animação ou origem japonesa (campos de /search/* e de detalhes).
+    """
+    genre_ids = result.get("genre_ids") or [g.get("id") for g in result.get("genres") or []]
+    return (
+        ANIMATION_GENRE_ID in genre_ids
+        or result.get("original_language") == "ja"
+        or "JP" in (result.get("origin_country") or [])
+    )
+
+# ==========================================================
+# INDEX
+# ==========================================================
+
+class TMDBTitleIndex:
+    """
+    Índice invertido local de títulos TMDB (n-grams de caractere sobre a
+    saída do TitleNormalizer). Gera candidatos sem chamar /search.
+    """
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ======================================================
+    # BUILD
+    # ======================================================
+
+    def add(
+        self,
+        tmdb_id: int,
+        media_type: str,
+        titles: Iterable[Optional[str]],
+        year: Optional[int] = None,
+        popularity: Optional[float] = None,
+    ):
+        key = f"{media_type}:{tmdb_id}"
+        titles = [t for t in titles if t]
+        normalized = [n for n in TitleNormalizer.normalize_many(titles) if n]
+        if not normalized:
+            return
+
+        with self._lock:
+            idx = self._by_key.get(key)
+
+            if idx is None:
+                idx = len(self.entries)
+                self._by_key[key] = idx
+                self.entries.append({
+                    "id": tmdb_id,
+                    "media_type": media_type,
+                    "title": titles[0],
+                    "year": year,
+                    "popularity": popularity,
+                    "titles": [],
+                })
+
+            entry = self.entries[idx]
+            entry["year"] = entry["year"] or year
+            entry["popularity"] = entry["popularity"] or popularity
+
+            for norm in normalized:
+                if norm not in entry["titles"]:
+                    entry["titles"].append(norm)
+                    self._index_title(idx, norm)
+
+    def _index_title(self, idx: int, norm: str):
+        for gram in ngrams(norm):
+            postings = self._postings.setdefault(gram, [])
+            if idx not in postings[-1:]:
+                postings.append(idx)
+
+    def add_export_file(self, path: str, media_type: str, min_popularity: float = 0.0) -> int:
+        """
+        Arquivo de export diário do TMDB (gzip, um JSON por linha).
+        O export não traz gênero/país: só entram títulos originais com kana
+        (japoneses), acima de `min_popularity`; o resto do catálogo
+        (live-action ocidental etc.) casaria com romaji curtos/comuns.
+        """
+        added = 0
+        title_field = "original_title" if media_type == "movie" else "original_name"
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                item = json.loads(line)
+                if item.get("adult") or (item.get("popularity") or 0) < min_popularity:
+                    continue
+                if not KANA_RE.search(item.get(title_field) or ""):
+                    continue
+
+                self.add(item["id"], media_type, [item.get(title_field)], popularity=item.get("popularity"))
+                added += 1
+
+        log(f"{os.path.basename(path)}: {added} títulos")
+        return added
+
+    def add_search_result(self, result: Dict[str, Any], media_type: Optional[str] = None):
+        media_type = result.get("media_type") or media_type
+        if media_type not in ("tv", "movie") or not is_anime_like(result):
+            return
+
+        self.add(
+            result["id"],
+            media_type,
+            [
+                result.get("name") or result.get("title"),
+                result.get("original_name") or result.get("original_title"),
+            ],
+            year=_year(result.get("first_air_date") or result.get("release_date")),
+            popularity=result.get("popularity"),
+        )
+
+    def add_details(self, details: Dict[str, Any], media_type: str):
+        if not details.get("id") or not is_anime_like(details):
+            return
+
+        titles = [
+            details.get("name") or details.get("title"),
+            details.get("original_name") or details.get("original_title"),
+        ]
+
+        # títulos alternativos / traduções, quando vieram no append_to_response
+        alt = details.get("alternative_titles") or {}
+        titles += [t.get("title") for t in alt.get("results") or alt.get("titles") or []]
+
+        for t in (details.get("translations") or {}).get("translations") or []:
+            data = t.get("data") or {}
+            titles.append(data.get("name") or data.get("title"))
+
+        self.add(
+            details["id"],
+            media_type,
+            titles,
+            year=_year(details.get("first_air_date") or details.get("release_date")),
+            popularity=details.get("popularity"),
+        )
+
+    def add_from_cache(self, cache) -> int:
+        """
+        Indexa respostas já guardadas no HTTPCache (buscas e detalhes).
+        """
+        before = len(self)
+
+        for endpoint, body in cache.iter_bodies("/search/"):
+            typed = endpoint.split("/")[-1]
+            for result in body.get("results") or []:
+                self.add_search_result(result, typed if typed in ("tv", "movie") else None)
+
+        for media_type in ("tv", "movie"):
+            for endpoint, body in cache.iter_bodies(f"/{media_type}/"):
+                # /tv/{id} apenas (ignora /tv/changes etc.)
+                if endpoint.rstrip("/").split("/")[-1].isdigit():
+                    self.add_details(body, media_type)
+
+        log(f"Cache HTTP: {len(self) - before} títulos novos")
+        return len(self) - before
+
+    # ======================================================
+    # QUERY
+    # ======================================================
+
+    def search(
+        self,
+        title: Optional[str],
+        limit: int = 5,
+        media_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Candidatos para um título já normalizado, com score de TitleSimilarity.
+        """
+        if not title or not self.entries or limit <= 0:
+            return []
+
+        max_posting = max(1, int(len(self.entries) * MAX_POSTING_RATIO))
+        counts: Counter = Counter()
+
+        for gram in ngrams(title):
+            postings = self._postings.get(gram)
+            if postings and len(postings) <= max_posting:
+                counts.update(postings)
+
+        # filtra o tipo antes do corte: senão o top PREFILTER_LIMIT pode ser
+        # todo do outro tipo e a busca tipada volta vazia
+        if media_type:
+            counts = Counter({
+                idx: n for idx, n in counts.items()
+                if self.entries[idx]["media_type"] == media_type
+            })
+
+        candidates = [idx for idx, _ in counts.most_common(PREFILTER_LIMIT)]
+
+        # score exato (difflib) só para quem ainda pode entrar no top `limit`:
+        # o limite superior (LCS) de um descartado fica abaixo de `limit` scores exatos
+        bounds = {
+            idx: max(TitleSimilarity.score_upper_bound(title, t) for t in self.entries[idx]["titles"])
+            for idx in candidates
+        }
+        scored: Dict[int, tuple] = {}
+        top: List[float] = []
+
+        for idx in sorted(candidates, key=bounds.__getitem__, reverse=True):
+            if len(top) >= limit and bounds[idx] < top[limit - 1]:
+                break
+
+            scores = TitleSimilarity.score_many(title, self.entries[idx]["titles"])
+            best = max(range(len(scores)), key=scores.__getitem__)
+            scored[idx] = (best, scores[best])
+
+            top.append(scores[best])
+            top.sort(reverse=True)
+
+        results = []
+        for idx in candidates:
+            if idx not in scored:
+                continue
+
+            entry = self.entries[idx]
+            best, score = scored[idx]
+
+            results.append({
+                "id": entry["id"],
+                "media_type": entry["media_type"],
+                "title": entry["title"],
+                "matched_title": entry["titles"][best],
+                "year": entry["year"],
+                "score": score,
+            })
+
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[:limit]
+
+    # ======================================================
+    # PERSISTENCE
+    # ======================================================
+
+    def save(self, path: str = INDEX_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, separators=(",", ":"))
+        log(f"Índice salvo: {len(self)} títulos → {path}")
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> "TMDBTitleIndex":
+        index = cls()
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            entries = json.load(f)
+
+        # postings são reconstruídos (mais barato que serializar)
+        for entry in entries:
+            idx = len(index.entries)
+            index._by_key[f"{entry['media_type']}:{entry['id']}"] = idx
+            index.entries.append(entry)
+            for norm in entry["titles"]:
+                index._index_title(idx, norm)
+
+        return index
+
+# ==========================================================
+# DEFAULT (CARREGADO UMA VEZ)
+# ==========================================================
+
+_default_index: Optional[TMDBTitleIndex] = None
+_default_lock = threading.Lock()
+
+def get_default_index() -> Optional[TMDBTitleIndex]:
+    global _default_index
+
+    with _default_lock:
+        if _default_index is None and os.path.exists(INDEX_FILE):
+            _default_index = TMDBTitleIndex.load(INDEX_FILE)
+            log(f"Índice local carregado: {len(_default_index)} títulos")
+        return _default_index
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from jsonschema import Draft7Validator
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SCHEMA_FILE = os.path.join(ROOT_DIR, "schemas", "anime.schema.json")
+
+# ==========================================================
+# COMPILER
+# ==========================================================
+
+# palavras-chave sem efeito na validação
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "default", "examples", "$comment"}
+
+def _type_check(name: str) -> Callable[[Any], bool]:
+    # mesma semântica de tipos do Draft 7 (bool não é número; 1.0 é integer)
+    if name == "integer":
+        return lambda v: (type(v) is int) or (type(v) is float and v.is_integer())
+    if name == "number":
+        return lambda v: type(v) in (int, float)
+    if name == "string":
+        return lambda v: type(v) is str
+    if name == "boolean":
+        return lambda v: type(v) is bool
+    if name == "null":
+        return lambda v: v is None
+    if name == "object":
+        return lambda v: type(v) is dict
+    if name == "array":
+        return lambda v: type(v) is list
+    raise KeyError(name)
+
+def compile_schema(schema: Dict[str, Any]) -> Optional[Callable[[Any], bool]]:
+    """
+    Gera uma função Python (closures aninhadas) equivalente a is_valid
+    para o subconjunto de palavras-chave usado em schemas/. Devolve None
+    se o schema usa algo fora desse subconjunto.
+    """
+    if not isinstance(schema, dict):
+        return None
+
+    unknown = set(schema) - _ANNOTATIONS - {
+        "type", "required", "properties", "additionalProperties", "items", "enum",
+    }
+    if unknown:
+        return None
+
+    checks: List[Callable[[Any], bool]] = []
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        try:
+            types = [_type_check(n) for n in names]
+        except KeyError:
+            return None
+        checks.append(types[0] if len(types) == 1 else (lambda v, t=tuple(types): any(c(v) for c in t)))
+
+    if "enum" in schema:
+        enum = list(schema["enum"])
+        # como no jsonschema: True != 1, mas 1 == 1.0
+        checks.append(lambda v: any(v == e and (type(v) is bool) == (type(e) is bool) for e in enum))
+
+    required = tuple(schema.get("required", ()))
+    properties = {}
+    for key, sub in (schema.get("properties") or {}).items():
+        fn = compile_schema(sub)
+        if fn is None:
+            return None
+        properties[key] = fn
+
+    extra = schema.get("additionalProperties", True)
+    extra_fn = None
+    if isinstance(extra, dict):
+        extra_fn = compile_schema(extra)
+        if extra_fn is None:
+            return None
+    elif extra is not True and extra is not False:
+        return None
+
+    if required or properties or extra is not True:
+        props = tuple(properties.items())
+        known = frozenset(properties)
+
+        def check_object(v):
+            if type(v) is not dict:
+                return True
+            for key in required:
+                if key not in v:
+                    return False
+            for key, fn in props:
+                if key in v and not fn(v[key]):
+                    return False
+            if extra is False:
+                return all(k in known for k in v)
+            if extra_fn is not None:
+                return all(extra_fn(val) for k, val in v.items() if k not in known)
+            return True
+
+        checks.append(check_object)
+
+    if "items" in schema:
+        item_fn = compile_schema(schema["items"])
+        if item_fn is None:
+            return None
+        checks.append(lambda v: type(v) is not list or all(item_fn(i) for i in v))
+
+    if not checks:
+        return lambda v: True
+    if len(checks) == 1:
+        return checks[0]
+    return lambda v: all(c(v) for c in checks)
+
+# ==========================================================
+# VALIDATOR
+# ==========================================================
+
+def format_error(error) -> str:
+    path = ".".join(str(p) for p in error.absolute_path)
+    return f"{path}: {error.message}" if path else error.message
+
+
+class SchemaValidator:
+    """
+    Validador compilado uma vez por schema: o metaschema é checado só na
+    construção, e cada registro passa pelo caminho rápido (função gerada
+    por compile_schema, ou Draft7Validator.is_valid se o schema não couber);
+    iter_errors (todas as falhas, não só a primeira) só roda nos inválidos.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        Draft7Validator.check_schema(schema)
+        self.schema = schema
+        self._validator = Draft7Validator(schema)
+        self._check = compile_schema(schema) or self._validator.is_valid
+
+    @classmethod
+    def from_file(cls, path: str = SCHEMA_FILE) -> "SchemaValidator":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def is_valid(self, record: Any) -> bool:
+        return self._check(record)
+
+    def errors(self, record: Any) -> List[str]:
+        if self._check(record):
+            return []
+
+        return sorted(format_error(e) for e in self._validator.iter_errors(record))
+
+    def validate_batch(self, records: Iterable[Any]) -> List[List[str]]:
+        """
+        Lista de erros por registro (vazia = válido), na ordem de entrada.
+        """
+        return [self.errors(record) for record in records]
+
+
+@lru_cache(maxsize=None)
+def get_validator(path: str = SCHEMA_FILE) -> SchemaValidator:
+    return SchemaValidator.from_file(path)